@@ -0,0 +1,99 @@
+import io
+import wave
+from math import gcd
+
+import numpy as np
+
+
+def resample(audio, orig_sr, target_sr):
+    """float32 모노 오디오 리샘플링
+
+    Args:
+        audio (np.ndarray): 입력 오디오
+        orig_sr (int): 원본 샘플레이트
+        target_sr (int): 목표 샘플레이트
+
+    Returns:
+        np.ndarray: 리샘플링된 float32 오디오
+    """
+    if orig_sr == target_sr:
+        return audio.astype(np.float32, copy=False)
+    try:
+        from scipy.signal import resample_poly
+        factor = gcd(orig_sr, target_sr)
+        return resample_poly(audio, target_sr // factor, orig_sr // factor).astype(np.float32)
+    except ImportError:
+        duration = len(audio) / orig_sr
+        target_len = int(round(duration * target_sr))
+        x_old = np.linspace(0.0, duration, num=len(audio), endpoint=False)
+        x_new = np.linspace(0.0, duration, num=target_len, endpoint=False)
+        return np.interp(x_new, x_old, audio).astype(np.float32)
+
+
+class AudioClip:
+    def __init__(self, samples, sample_rate):
+        """메모리 상의 모노 오디오
+
+        TTS, RVC, 재생 단계 사이를 파일 없이 그대로 전달하기 위한 객체입니다.
+
+        Args:
+            samples (np.ndarray): float32 모노 샘플 (-1.0 ~ 1.0)
+            sample_rate (int): 샘플레이트
+        """
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+
+    @property
+    def duration(self):
+        """길이 (초)"""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def __len__(self):
+        return len(self.samples)
+
+    @classmethod
+    def from_pcm16(cls, data, sample_rate, channels=1):
+        """16비트 PCM 바이트로부터 생성 (다채널이면 모노로 합침)"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        return cls(samples, sample_rate)
+
+    @classmethod
+    def from_wav_bytes(cls, data):
+        """WAV 바이트(헤더 포함)로부터 생성"""
+        with wave.open(io.BytesIO(data), 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"지원하지 않는 샘플 폭: {wf.getsampwidth()}")
+            return cls.from_pcm16(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+
+    @classmethod
+    def from_file(cls, path):
+        """WAV 파일로부터 생성"""
+        with open(path, 'rb') as f:
+            return cls.from_wav_bytes(f.read())
+
+    def to_pcm16(self):
+        """16비트 PCM 바이트로 변환"""
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+    def to_wav_bytes(self):
+        """WAV 바이트(헤더 포함)로 변환"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.to_pcm16())
+        return buffer.getvalue()
+
+    def save(self, path):
+        """WAV 파일로 저장 (디버깅/캐시용)"""
+        with open(path, 'wb') as f:
+            f.write(self.to_wav_bytes())
+
+    def resample(self, target_rate):
+        """다른 샘플레이트로 변환한 새 클립 반환"""
+        if target_rate == self.sample_rate:
+            return self
+        return AudioClip(resample(self.samples, self.sample_rate, target_rate), target_rate)
@@ -0,0 +1,149 @@
+import time
+import queue
+import threading
+
+import pyaudio
+
+
+class AudioPlayer:
+    def __init__(self, sample_rate=48000, block_size=1024, metrics=None):
+        """상주형 오디오 출력 엔진 초기화
+
+        출력 장치를 한 번만 열어 두고 전용 스레드에서 재생 큐를 처리합니다.
+        모든 클립은 고정된 형식(16비트 모노, sample_rate)으로 변환되어
+        같은 스트림에 이어서 쓰이므로 클립 사이에 간격이 생기지 않습니다.
+
+        Args:
+            sample_rate (int): 출력 샘플레이트
+            block_size (int): 한 번에 쓰는 프레임 수 (취소 반응 단위)
+            metrics (LatencyMetrics, optional): 대기/재생 시간을 기록할 수집기
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.metrics = metrics
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paInt16,
+                                     channels=1,
+                                     rate=sample_rate,
+                                     output=True,
+                                     frames_per_buffer=block_size)
+        self._queue = queue.Queue()
+        self._generation = 0
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._start_callbacks = []
+        self._end_callbacks = []
+        self.is_playing = False
+        self.running = True
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_start_callback(self, callback):
+        """클립 재생이 시작될 때 호출할 콜백 추가 (callback(clip))"""
+        self._start_callbacks.append(callback)
+
+    def add_end_callback(self, callback):
+        """클립 재생이 끝날 때 호출할 콜백 추가 (callback(clip, cancelled))"""
+        self._end_callbacks.append(callback)
+
+    def enqueue(self, clip):
+        """클립을 재생 큐에 추가 (바로 반환)
+
+        Args:
+            clip (AudioClip): 재생할 오디오
+        """
+        if not clip:
+            return
+        with self._condition:
+            self._pending += 1
+            self._queue.put((self._generation, clip, time.perf_counter()))
+
+    def play(self, clip, wait=True):
+        """클립 재생
+
+        Args:
+            clip (AudioClip): 재생할 오디오
+            wait (bool): 재생이 끝날 때까지 대기할지 여부
+        """
+        self.enqueue(clip)
+        if wait:
+            self.flush()
+
+    def flush(self, timeout=None):
+        """큐에 있는 모든 클립의 재생이 끝날 때까지 대기
+
+        Args:
+            timeout (float, optional): 최대 대기 시간 (초)
+
+        Returns:
+            bool: 제한 시간 안에 재생이 모두 끝났는지 여부
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def cancel(self):
+        """재생 중인 클립을 즉시 멈추고 대기 중인 클립을 모두 버림"""
+        with self._condition:
+            self._generation += 1
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending -= 1
+            self._condition.notify_all()
+
+    def _notify(self, callbacks, *args):
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"재생 이벤트 콜백 오류: {e}")
+
+    def _run(self):
+        while self.running:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, clip, enqueued_at = item
+
+            cancelled = generation != self._generation
+            if not cancelled:
+                pcm = clip.resample(self.sample_rate).to_pcm16()
+                step = self.block_size * 2  # 16비트 모노
+                self.is_playing = True
+                started_at = time.perf_counter()
+                if self.metrics:
+                    self.metrics.record("playback_queue_wait", started_at - enqueued_at)
+                self._notify(self._start_callbacks, clip)
+                try:
+                    for offset in range(0, len(pcm), step):
+                        if generation != self._generation or not self.running:
+                            cancelled = True
+                            break
+                        self._stream.write(pcm[offset:offset + step])
+                except Exception as e:
+                    print(f"오디오 재생 중 오류 발생: {str(e)}")
+                self.is_playing = False
+                if self.metrics:
+                    if cancelled:
+                        self.metrics.increment("playback_cancelled")
+                    else:
+                        self.metrics.record("playback", time.perf_counter() - started_at, clip.duration)
+                self._notify(self._end_callbacks, clip, cancelled)
+
+            # cancel()이 큐에서 버린 항목은 cancel()에서 이미 셌으므로 여기서는 꺼낸 항목만 셈
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify_all()
+
+    def close(self):
+        """재생을 멈추고 출력 장치 해제"""
+        self.cancel()
+        self.running = False
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pa.terminate()
@@ -0,0 +1,119 @@
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_clip import AudioClip
+
+
+class MicrophoneSource:
+    def __init__(self, sample_rate=16000, block_size=1600):
+        """마이크 입력 소스
+
+        Args:
+            sample_rate (int): 녹음 샘플레이트
+            block_size (int): 콜백 한 번에 전달할 샘플 수
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+
+    def run(self, on_audio, stop_event):
+        """stop_event가 설정될 때까지 녹음한 블록을 on_audio(block)로 전달"""
+        import sounddevice as sd
+
+        def audio_callback(indata, frames, time_info, status):
+            """오디오 입력 콜백"""
+            if stop_event.is_set():
+                return
+            # 첫 채널만 전달 (받는 쪽에서 바로 버퍼에 기록)
+            on_audio(indata[:, 0])
+
+        with sd.InputStream(callback=audio_callback,
+                            channels=1,
+                            samplerate=self.sample_rate,
+                            blocksize=self.block_size):
+            stop_event.wait()
+
+
+class WavFileSource:
+    def __init__(self, paths, sample_rate=16000, block_size=1600, realtime=True, gap_seconds=2.0,
+                 wait_idle=None, on_file_start=None, on_speech_end=None):
+        """WAV 파일 묶음을 마이크 입력처럼 재생하는 소스
+
+        녹음해 둔 발화를 실제 음성 인식 경로(VAD → 인식)로 그대로 흘려보내
+        마이크 없이 지연 시간과 처리량을 측정하기 위한 것입니다. 각 파일 뒤에는
+        gap_seconds 길이의 무음을 붙여 발화가 끝났음을 알립니다.
+
+        Args:
+            paths (list): WAV 파일 경로 목록
+            sample_rate (int): 전달할 샘플레이트 (파일은 이 값으로 변환)
+            block_size (int): 한 번에 전달할 샘플 수
+            realtime (bool): True면 실제 시간 속도로, False면 가능한 한 빠르게 전달
+            gap_seconds (float): 파일 사이에 넣을 무음 길이 (초)
+            wait_idle (callable, optional): 다음 파일을 보내기 전에 호출해 인식이
+                끝날 때까지 기다리는 함수 (빠른 재생 시 대기열이 넘치지 않도록 함)
+            on_file_start (callable, optional): 파일을 보내기 시작할 때 호출 (callback(index, path))
+            on_speech_end (callable, optional): 파일의 마지막 음성 샘플을 보낸 직후 호출
+                (callback(index, timestamp), timestamp는 time.perf_counter 기준)
+        """
+        self.paths = [str(path) for path in paths]
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.realtime = realtime
+        self.gap_samples = int(gap_seconds * sample_rate)
+        self.wait_idle = wait_idle
+        self.on_file_start = on_file_start
+        self.on_speech_end = on_speech_end
+        self.audio_seconds = 0.0
+        self.finished = threading.Event()
+
+    @classmethod
+    def from_directory(cls, directory, **kwargs):
+        """디렉토리의 모든 WAV 파일(이름순)로 소스 생성"""
+        return cls(sorted(Path(directory).glob("*.wav")), **kwargs)
+
+    def _blocks(self, audio):
+        for offset in range(0, len(audio), self.block_size):
+            yield audio[offset:offset + self.block_size]
+
+    def run(self, on_audio, stop_event):
+        """모든 파일을 순서대로 on_audio(block)로 전달 (stop_event가 설정되면 중단)
+
+        모든 파일을 보냈거나 중단되면 finished 이벤트가 설정됩니다.
+        """
+        try:
+            self._play(on_audio, stop_event)
+        finally:
+            self.finished.set()
+
+    def _play(self, on_audio, stop_event):
+        silence = np.zeros(self.gap_samples, dtype=np.float32)
+        next_time = time.perf_counter()
+
+        for index, path in enumerate(self.paths):
+            if self.wait_idle:
+                self.wait_idle()
+                next_time = time.perf_counter()
+            if stop_event.is_set():
+                return
+            if self.on_file_start:
+                self.on_file_start(index, path)
+
+            clip = AudioClip.from_file(path).resample(self.sample_rate)
+            self.audio_seconds += clip.duration
+            for part, audio in enumerate((clip.samples, silence)):
+                for block in self._blocks(audio):
+                    if self.realtime:
+                        # 블록 길이만큼 실제 시간이 흐른 뒤에 다음 블록 전달
+                        next_time += len(block) / self.sample_rate
+                        if stop_event.wait(max(0.0, next_time - time.perf_counter())):
+                            return
+                    elif stop_event.is_set():
+                        return
+                    on_audio(block)
+                if part == 0 and self.on_speech_end:
+                    self.on_speech_end(index, time.perf_counter())
+
+        if self.wait_idle:
+            self.wait_idle()
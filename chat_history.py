@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+
+import google.generativeai as genai
+
+SUMMARY_PROMPT = """다음은 AI 스트리머 '하나'와 시청자들의 방송 대화입니다.
+기존 요약에 새 대화 내용을 합쳐 {max_chars}자 이내의 요약 하나로 갱신하세요.
+시청자 이름, 주고받은 주제, 약속이나 기억해야 할 사실 위주로 간결하게 적고 요약문만 출력하세요.
+
+기존 요약:
+{summary}
+
+새 대화:
+{dialogue}"""
+
+_WIDE_CHARS = re.compile("[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7a3]")
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (한글/한자/가나는 글자당 1토큰, 나머지는 약 4글자당 1토큰)"""
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+class ConversationHistory:
+    def __init__(self, model_name, keep_turns=6, max_tokens=1500, summary_chars=600, max_pending=None):
+        """토큰 예산 안에서 유지되는 대화 기록
+
+        최근 keep_turns턴은 그대로 보내고, 그보다 오래되었거나 토큰 예산을 넘는 턴은
+        백그라운드 스레드에서 누적 요약 하나로 합칩니다. 몇 시간짜리 방송에서도
+        요청마다 보내는 대화 기록 크기가 일정하게 유지됩니다.
+
+        Args:
+            model_name (str): 요약에 쓸 Gemini 모델 이름
+            keep_turns (int): 그대로 유지할 최근 턴 수
+            max_tokens (int): 그대로 유지할 턴들의 토큰 예산 (추정치)
+            summary_chars (int): 요약 최대 길이 (글자)
+            max_pending (int, optional): 요약을 기다리는 턴의 최대 수 (기본: keep_turns * 2,
+                요약이 계속 실패하면 가장 오래된 턴부터 버림)
+        """
+        self.keep_turns = keep_turns
+        self.max_tokens = max_tokens
+        self.summary_chars = summary_chars
+        self.max_pending = max_pending if max_pending is not None else keep_turns * 2
+        self.summary = ""
+        self._turns = []
+        self._pending = []
+        self._summarizer = genai.GenerativeModel(model_name=model_name,
+                                                 generation_config={"temperature": 0.2})
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+        self.summaries = 0
+        self.summarized_turns = 0
+        self.summary_errors = 0
+        self.dropped_turns = 0
+        self.summary_seconds = 0.0
+
+    def add_turn(self, user, reply, reply_tokens=None):
+        """턴 추가 후 오래된 턴은 요약 대기열로 넘김
+
+        Args:
+            user (str): 사용자 메시지 (예시 대화를 붙이기 전 원래 메시지)
+            reply (str): 하나의 응답
+            reply_tokens (int, optional): API가 알려준 응답 토큰 수 (없으면 추정)
+        """
+        tokens = estimate_tokens(user) + (reply_tokens if reply_tokens is not None else estimate_tokens(reply))
+        with self._lock:
+            self._turns.append({"user": user, "model": reply, "tokens": tokens})
+            # 마지막 턴은 예산을 넘더라도 그대로 유지
+            while len(self._turns) > 1 and (len(self._turns) > self.keep_turns
+                                            or sum(turn["tokens"] for turn in self._turns) > self.max_tokens):
+                self._pending.append(self._turns.pop(0))
+            if not self._pending:
+                return
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped_turns += overflow
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def contents(self):
+        """요청에 넣을 대화 기록 (요약 + 요약 대기 중인 턴 + 최근 턴)"""
+        with self._lock:
+            summary = self.summary
+            turns = self._pending + self._turns
+        contents = []
+        if summary:
+            contents.append({"role": "user", "parts": [f"지금까지의 대화 요약:\n{summary}"]})
+            contents.append({"role": "model", "parts": ["네, 참고해서 이어가겠습니다."]})
+        for turn in turns:
+            contents.append({"role": "user", "parts": [turn["user"]]})
+            contents.append({"role": "model", "parts": [turn["model"]]})
+        return contents
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+            self._summarize_pending()
+
+    def _summarize_pending(self):
+        """요약 대기 중인 턴을 기존 요약에 합침 (실패하면 다음 턴에서 다시 시도)"""
+        with self._lock:
+            batch = list(self._pending)
+            summary = self.summary
+        if not batch:
+            return
+
+        dialogue = "".join(f"User: {turn['user']}\nAssistant: {turn['model']}\n" for turn in batch)
+        prompt = SUMMARY_PROMPT.format(max_chars=self.summary_chars, summary=summary or "(없음)",
+                                       dialogue=dialogue)
+        start_time = time.perf_counter()
+        try:
+            new_summary = self._summarizer.generate_content(prompt).text.strip()
+        except Exception as e:
+            with self._lock:
+                self.summary_errors += 1
+            print(f"대화 요약 중 오류 발생: {e}")
+            return
+
+        summarized = {id(turn) for turn in batch}
+        with self._lock:
+            # 요약하는 동안 넘치거나 새로 들어온 턴은 그대로 둠
+            self._pending = [turn for turn in self._pending if id(turn) not in summarized]
+            self.summary = new_summary[:self.summary_chars * 2]
+            self.summaries += 1
+            self.summarized_turns += len(batch)
+            self.summary_seconds += time.perf_counter() - start_time
+
+    def stats(self):
+        """대화 기록 크기와 요약 통계 반환"""
+        with self._lock:
+            return {
+                "recent_turns": len(self._turns),
+                "pending_turns": len(self._pending),
+                "history_tokens": estimate_tokens(self.summary)
+                + sum(turn["tokens"] for turn in self._pending + self._turns),
+                "summary_chars": len(self.summary),
+                "summaries": self.summaries,
+                "summarized_turns": self.summarized_turns,
+                "summary_errors": self.summary_errors,
+                "dropped_turns": self.dropped_turns,
+                "mean_summary_seconds": self.summary_seconds / self.summaries if self.summaries else None,
+            }
+
+    def close(self):
+        """요약 스레드 종료"""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,227 @@
+import datetime
+import threading
+import time
+
+import google.generativeai as genai
+
+from chat_history import ConversationHistory, estimate_tokens
+from persona import build_user_message, format_examples
+
+
+class _UsageTrackingStream:
+    """스트리밍 응답을 그대로 넘겨주면서 끝까지 읽히면 토큰 사용량을 기록"""
+
+    def __init__(self, response, on_done):
+        self._response = response
+        self._on_done = on_done
+
+    def __iter__(self):
+        for chunk in self._response:
+            yield chunk
+        self._on_done(self._response)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class HanaChat:
+    def __init__(self, model_name, system_instruction, generation_config=None, safety_settings=None,
+                 use_cache=True, cache_ttl_hours=4, min_cache_tokens=1024, retriever=None, examples_k=8,
+                 keep_turns=6, history_tokens=1500):
+        """시스템 지시문 기반 Gemini 대화 세션 초기화
+
+        페르소나와 예시 대화를 첫 대화 턴으로 보내는 대신 시스템 지시문으로 두고,
+        가능하면 API의 컨텍스트 캐시에 한 번만 올려 두어 매 턴마다 같은 접두부를
+        다시 처리하지 않도록 합니다. 지시문이 명시적 캐시의 최소 토큰 수보다 짧거나
+        (예시를 검색으로 붙이는 페르소나 전용 지시문은 보통 이에 해당) 캐시를 만들 수
+        없으면(모델 미지원 등) 일반 시스템 지시문으로 동작합니다.
+
+        retriever가 있으면 예시 대화 전체 대신 메시지마다 가장 비슷한 예시 k개만
+        그 요청에 붙이므로, 예시 데이터가 늘어나도 프롬프트 크기는 일정합니다.
+        대화 기록도 최근 턴만 그대로 두고 나머지는 누적 요약으로 합쳐 크기를 제한합니다.
+
+        Args:
+            model_name (str): Gemini 모델 이름
+            system_instruction (str): 시스템 지시문 (페르소나, 검색기를 쓰지 않으면 예시 포함)
+            generation_config (dict, optional): 생성 설정
+            safety_settings (list, optional): 안전 설정
+            use_cache (bool): 컨텍스트 캐시 사용 시도 여부
+            cache_ttl_hours (float): 캐시 유지 시간 (방송 길이에 맞춤)
+            min_cache_tokens (int): 명시적 캐시의 최소 토큰 수 (추정치가 이보다 작으면 캐시를 시도하지 않음)
+            retriever (ExampleRetriever, optional): 메시지별 예시 대화 검색기
+            examples_k (int): 메시지마다 붙일 예시 수
+            keep_turns (int): 대화 기록에 그대로 유지할 최근 턴 수
+            history_tokens (int): 그대로 유지할 최근 턴들의 토큰 예산 (넘으면 요약으로 넘김)
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self.cache = None
+
+        prefix_tokens = estimate_tokens(system_instruction)
+        if use_cache and prefix_tokens < min_cache_tokens:
+            print(f"시스템 지시문이 약 {prefix_tokens} 토큰으로 컨텍스트 캐시 최소 크기({min_cache_tokens})보다 "
+                  "작아 캐시 없이 보냅니다.")
+            use_cache = False
+
+        if use_cache:
+            try:
+                self.cache = genai.caching.CachedContent.create(
+                    model=model_name,
+                    display_name="hana-persona",
+                    system_instruction=system_instruction,
+                    ttl=datetime.timedelta(hours=cache_ttl_hours),
+                )
+                self.model = genai.GenerativeModel.from_cached_content(
+                    cached_content=self.cache,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings)
+                print("페르소나 프롬프트를 컨텍스트 캐시에 올렸습니다.")
+            except Exception as e:
+                print(f"컨텍스트 캐시를 사용할 수 없어 시스템 지시문으로 대체합니다: {e}")
+                self.cache = None
+
+        if self.cache is None:
+            self.model = genai.GenerativeModel(model_name=model_name,
+                                               generation_config=generation_config,
+                                               safety_settings=safety_settings,
+                                               system_instruction=system_instruction)
+
+        self.retriever = retriever
+        self.examples_k = examples_k
+        # 대화 기록에는 예시를 붙이기 전의 원래 메시지만 저장
+        self.conversation = ConversationHistory(model_name, keep_turns=keep_turns, max_tokens=history_tokens)
+        self._lock = threading.Lock()
+        self.retrievals = 0
+        self.retrieval_seconds = 0.0
+        self.max_retrieval_seconds = 0.0
+        self.turns = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.last_prompt_tokens = None
+
+    @property
+    def history(self):
+        """요청에 넣는 대화 기록 (누적 요약 + 최근 턴)"""
+        return self.conversation.contents()
+
+    def _with_examples(self, message, query=None):
+        """검색한 예시 대화를 붙인 이번 요청용 메시지"""
+        if self.retriever is None:
+            return message
+        start_time = time.perf_counter()
+        hits = self.retriever.search(query if query is not None else message, k=self.examples_k)
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.retrievals += 1
+            self.retrieval_seconds += elapsed
+            self.max_retrieval_seconds = max(self.max_retrieval_seconds, elapsed)
+        return build_user_message(message, [example for _, example in hits])
+
+    def send_message(self, message, stream=False, query=None, **kwargs):
+        """메시지 전송 (ChatSession.send_message와 같은 사용법)
+
+        Args:
+            message (str): 보낼 메시지
+            stream (bool): 스트리밍 응답 여부
+            query (str, optional): 예시 검색에 쓸 텍스트 (기본: message)
+
+        Returns:
+            GenerateContentResponse: 응답 (stream=True면 끝까지 읽을 때 대화 기록과 사용량이 갱신됨)
+        """
+        contents = self.history + [{"role": "user", "parts": [self._with_examples(message, query)]}]
+        response = self.model.generate_content(contents, stream=stream, **kwargs)
+
+        def on_done(done_response):
+            self._finish_turn(message, done_response)
+
+        if stream:
+            return _UsageTrackingStream(response, on_done)
+        on_done(response)
+        return response
+
+    def _finish_turn(self, message, response):
+        """사용량을 기록하고 원래 메시지와 응답을 대화 기록에 추가"""
+        self._record_usage(response)
+        try:
+            reply = response.text
+        except ValueError:
+            # 안전 필터 등으로 응답이 없으면 기록하지 않음
+            return
+        usage = getattr(response, "usage_metadata", None)
+        self.conversation.add_turn(message, reply, getattr(usage, "candidates_token_count", None) or None)
+
+    def _record_usage(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        with self._lock:
+            self.turns += 1
+            self.last_prompt_tokens = usage.prompt_token_count
+            self.prompt_tokens += usage.prompt_token_count
+            self.cached_tokens += getattr(usage, "cached_content_token_count", 0) or 0
+            self.output_tokens += usage.candidates_token_count or 0
+
+    def report_prompt_tokens(self, legacy_instruction=None):
+        """턴당 고정 프롬프트의 비캐시 입력 토큰 수를 예전 방식과 비교해 출력
+
+        예전에는 페르소나와 예시 전체를 첫 대화 턴으로 보내 매 턴 대화 기록으로 다시
+        처리했으므로 그 전체가 턴마다 일반 입력 토큰이었습니다. 예시 검색을 쓰면
+        현재 값에는 메시지마다 붙는 예시 k개(앞쪽 예시로 추정)가 포함됩니다.
+
+        Args:
+            legacy_instruction (str, optional): 예전 방식의 전체 프롬프트 (기본: 현재 시스템 지시문)
+
+        Returns:
+            dict: {"prefix_tokens", "example_tokens", "uncached_before", "uncached_after", "cached"}
+        """
+        counter = genai.GenerativeModel(model_name=self.model_name)
+        prefix_tokens = counter.count_tokens(self.system_instruction).total_tokens
+        example_tokens = 0
+        if self.retriever is not None and len(self.retriever):
+            sample = self.retriever.examples[:self.examples_k]
+            example_tokens = counter.count_tokens(format_examples(sample)).total_tokens
+        before = counter.count_tokens(legacy_instruction).total_tokens if legacy_instruction else prefix_tokens
+        report = {
+            "prefix_tokens": prefix_tokens,
+            "example_tokens": example_tokens,
+            "uncached_before": before,
+            "uncached_after": (0 if self.cache is not None else prefix_tokens) + example_tokens,
+            "cached": self.cache is not None,
+        }
+        print(f"고정 프롬프트 {prefix_tokens} 토큰 + 메시지별 예시 약 {example_tokens} 토큰 - "
+              f"턴당 비캐시 입력: 기존 {report['uncached_before']} → 현재 {report['uncached_after']} "
+              f"({'컨텍스트 캐시' if report['cached'] else '시스템 지시문'})")
+        return report
+
+    def usage_stats(self):
+        """턴별 입력 토큰 사용량, 예시 검색 시간, 대화 기록 통계 반환"""
+        history = self.conversation.stats()
+        with self._lock:
+            uncached = self.prompt_tokens - self.cached_tokens
+            return {
+                "turns": self.turns,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "uncached_prompt_tokens": uncached,
+                "output_tokens": self.output_tokens,
+                "mean_prompt_tokens": self.prompt_tokens / self.turns if self.turns else None,
+                "mean_uncached_prompt_tokens": uncached / self.turns if self.turns else None,
+                "last_prompt_tokens": self.last_prompt_tokens,
+                "retrievals": self.retrievals,
+                "mean_retrieval_ms": self.retrieval_seconds / self.retrievals * 1000 if self.retrievals else None,
+                "max_retrieval_ms": self.max_retrieval_seconds * 1000,
+                "history": history,
+            }
+
+    def close(self):
+        """대화 요약 스레드 종료 및 컨텍스트 캐시 삭제 (남은 유지 시간 동안의 저장 비용 방지)"""
+        self.conversation.close()
+        if self.cache is not None:
+            try:
+                self.cache.delete()
+            except Exception as e:
+                print(f"컨텍스트 캐시 삭제 중 오류 발생: {e}")
+            self.cache = None
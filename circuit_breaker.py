@@ -0,0 +1,92 @@
+import time
+import threading
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, cooldown=60.0, name="service"):
+        """서킷 브레이커 초기화
+
+        연속 실패가 failure_threshold번 쌓이면 회로를 열어 cooldown 동안 요청을
+        막고, 그 뒤에는 요청 하나만 시험 삼아 통과시켜 복구 여부를 확인합니다.
+
+        Args:
+            failure_threshold (int): 회로를 열기까지 허용하는 연속 실패 횟수
+            cooldown (float): 회로가 열린 뒤 다시 시도하기까지 대기 시간 (초)
+            name (str): 로그에 표시할 서비스 이름
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.name = name
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.rejected_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """요청을 보내도 되는지 확인
+
+        Returns:
+            bool: True면 요청 가능, False면 바로 대체 경로 사용
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.rejected_count += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                print(f"{self.name} 복구 확인 중...")
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected_count += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """요청 성공 기록"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"{self.name} 복구됨")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """요청 실패 기록"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.open_count += 1
+                    print(f"{self.name} 연속 실패 {self.consecutive_failures}회 - {self.cooldown:.0f}초 동안 대체 경로 사용")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """결과 없이 버려진 요청 해제 (반개방 상태의 시험 요청이 취소되어도 다음 요청이 다시 시험하도록)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        """브레이커 상태 반환
+
+        Returns:
+            dict: 현재 상태, 연속 실패 횟수, 회로 열림 횟수, 차단된 요청 수
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened": self.open_count,
+                "rejected": self.rejected_count,
+            }
@@ -1,16 +1,21 @@
 import time
 import threading
 
+from llm_stream import stream_reply
+from response_cache import ResponseCache
+
 class ConversationHandler:
-    def __init__(self, tts, chat):
+    def __init__(self, tts, chat, response_cache=None):
         """대화 처리 핸들러 초기화
         
         Args:
             tts: 음성 합성 객체
             chat: 챗봇 객체
+            response_cache (ResponseCache, optional): 반복 메시지 응답 캐시 (기본: 새로 생성)
         """
         self.tts = tts
         self.chat = chat
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
         self.last_response_time = 0
         self.cooldown = 5  # 응답 간 최소 시간 간격 (초)
         self.is_processing = False
@@ -53,18 +58,24 @@ class ConversationHandler:
                 else:
                     prompt = f"{username}: {message}"
                 
-                # 챗봇에 메시지 전송
-                response = self.chat.send_message(prompt)
-                ai_response = response.text
-                
                 # 감정 추출 (간단한 키워드 기반)
                 emotion = self._get_emotion_from_text(message)
                 
-                # 음성 합성 및 재생 (음소거 상태가 아닐 때만)
-                if not self.is_muted:
-                    audio_path = self.tts.synthesize_with_emotion(ai_response, emotion=emotion)
-                    if audio_path:
-                        self.tts.play_audio(audio_path)
+                # 후원 메시지는 매번 새로 반응하고, 일반 채팅은 반복되는 질문이면 이전 응답을 재사용
+                cached = None if is_donation else self.response_cache.get(message)
+                if cached is not None:
+                    ai_response = self._replay_cached(cached, emotion)
+                else:
+                    # 챗봇 응답을 스트리밍으로 받으며 문장이 완성될 때마다 음성 합성 (음소거 상태가 아닐 때만)
+                    # 재생은 재생 엔진 스레드에 맡기고 합성이 끝나면 바로 잠금을 풂
+                    # 예시 대화는 사용자 이름을 뺀 메시지 본문으로 검색
+                    clips = []
+                    ai_response = stream_reply(self.chat, prompt, self.tts, emotion=emotion,
+                                               speak=not self.is_muted, wait=False, query=message, clips=clips)
+                    # 시청자 이름을 부른 응답은 다른 시청자에게 재사용하지 않음
+                    # 중단되었거나 일부 문장의 음성이 빠진 응답은 clips가 비어 있어, 적중 시 텍스트로 다시 합성
+                    if not is_donation and ai_response and username not in ai_response:
+                        self.response_cache.put(message, ai_response, clips)
                 
                 # 마지막 응답 시간 업데이트
                 self.last_response_time = time.time()
@@ -79,6 +90,17 @@ class ConversationHandler:
                 self.is_processing = False
                 return None
     
+    def _replay_cached(self, cached, emotion):
+        """캐시된 응답을 LLM 호출 없이 재생 (음소거 중에 저장되어 음성이 없으면 이번에만 합성)"""
+        self.tts.metrics.increment("response_cache_hit")
+        if not self.is_muted:
+            if cached.clips:
+                for clip in cached.clips:
+                    self.tts.player.enqueue(clip)
+            else:
+                cached.clips = self.tts.speak_streaming(cached.text, emotion=emotion, wait=False)
+        return cached.text
+    
     def _get_emotion_from_text(self, text):
         """텍스트에서 감정 추출 (간단한 키워드 기반)"""
         happy_keywords = ["좋아", "행복", "신나", "재미", "웃"]
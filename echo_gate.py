@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import deque
+
+
+class EchoGate:
+    def __init__(self, tail_margin=0.4, min_overlap=0.5, history=64):
+        """하나가 말하는 구간을 기록해 자기 목소리가 음성 인식으로 들어가는 것을 막는 게이트
+
+        재생 엔진의 시작/종료 콜백으로 말하는 구간(time.monotonic 기준)을 모아 두고,
+        음성 인식 쪽은 발화 구간이 이 구간과 많이 겹치면 인식하지 않고 버립니다.
+
+        Args:
+            tail_margin (float): 재생이 끝난 뒤에도 말하는 중으로 볼 시간 (출력 버퍼 지연과 잔향, 초)
+            min_overlap (float): 발화 길이 중 이 비율 이상이 말하는 구간과 겹치면 버림
+            history (int): 보관할 최근 구간 수
+        """
+        self.tail_margin = tail_margin
+        self.min_overlap = min_overlap
+        self._intervals = deque(maxlen=history)
+        self._speaking_since = None
+        self._lock = threading.Lock()
+        self.skipped_count = 0
+        self.skipped_seconds = 0.0
+
+    def attach(self, player):
+        """AudioPlayer의 재생 이벤트로 말하는 구간 기록 시작"""
+        player.add_start_callback(self._on_start)
+        player.add_end_callback(self._on_end)
+
+    def _on_start(self, clip):
+        with self._lock:
+            if self._speaking_since is None:
+                self._speaking_since = time.monotonic()
+
+    def _on_end(self, clip, cancelled):
+        with self._lock:
+            if self._speaking_since is not None:
+                self._intervals.append((self._speaking_since, time.monotonic()))
+                self._speaking_since = None
+
+    @property
+    def is_speaking(self):
+        """지금 말하는 중(또는 끝난 직후 여유 시간 안)인지 여부"""
+        now = time.monotonic()
+        with self._lock:
+            if self._speaking_since is not None:
+                return True
+            return bool(self._intervals) and now < self._intervals[-1][1] + self.tail_margin
+
+    def overlap_seconds(self, start, end):
+        """[start, end] 구간 중 말하는 구간(여유 시간 포함)과 겹치는 길이 (초)"""
+        with self._lock:
+            intervals = list(self._intervals)
+            if self._speaking_since is not None:
+                intervals.append((self._speaking_since, end))
+        overlap = 0.0
+        for speak_start, speak_end in intervals:
+            overlap += max(0.0, min(end, speak_end + self.tail_margin) - max(start, speak_start))
+        return overlap
+
+    def should_skip(self, start, end):
+        """발화 구간이 말하는 구간과 충분히 겹치면 True (건너뛴 횟수를 셈)
+
+        Args:
+            start (float): 발화 시작 시각 (time.monotonic 기준)
+            end (float): 발화 끝 시각 (time.monotonic 기준)
+        """
+        duration = max(end - start, 1e-6)
+        if self.overlap_seconds(start, end) / duration < self.min_overlap:
+            return False
+        with self._lock:
+            self.skipped_count += 1
+            self.skipped_seconds += duration
+        return True
+
+    def stats(self):
+        """건너뛴 인식 횟수와 오디오 길이 반환"""
+        with self._lock:
+            return {"skipped": self.skipped_count, "skipped_seconds": self.skipped_seconds}
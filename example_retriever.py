@@ -0,0 +1,119 @@
+import re
+import time
+
+import numpy as np
+
+
+def _normalize(text):
+    """비교용 텍스트 (소문자, 문장부호 제거, 공백 하나로)"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def char_ngrams(text, ngram_range=(2, 3)):
+    """글자 n-gram 목록 (띄어쓰기 차이에 덜 민감하도록 공백을 하나의 경계 문자로 취급)"""
+    text = f" {_normalize(text)} "
+    grams = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        grams.extend(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+class ExampleRetriever:
+    def __init__(self, examples, ngram_range=(2, 3), max_df=0.5):
+        """예시 대화 입력에 대한 글자 n-gram TF-IDF 검색 색인 생성
+
+        색인은 n-gram별 (문서 번호, 가중치) 목록을 CSR 배열로 저장한 역색인이라,
+        질의 한 번은 질의에 들어 있는 n-gram의 목록만 훑고 np.bincount로 점수를
+        합산합니다. 예시가 수만 개로 늘어도 질의 비용은 거의 늘지 않습니다.
+
+        Args:
+            examples (list): {"input": ..., "output": ...} 예시 목록
+            ngram_range (tuple): 사용할 n-gram 길이 범위
+            max_df (float): 이 비율보다 많은 예시에 나오는 n-gram은 변별력이 없어 제외
+        """
+        self.examples = examples
+        self.ngram_range = ngram_range
+        start_time = time.perf_counter()
+
+        # 예시별 n-gram 빈도
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for doc_id, example in enumerate(examples):
+            grams = {}
+            for gram in char_ngrams(example["input"], ngram_range):
+                term_id = vocabulary.setdefault(gram, len(vocabulary))
+                grams[term_id] = grams.get(term_id, 0) + 1
+            rows.extend([doc_id] * len(grams))
+            cols.extend(grams.keys())
+            counts.extend(grams.values())
+
+        doc_ids = np.array(rows, dtype=np.int32)
+        term_ids = np.array(cols, dtype=np.int32)
+        tf = 1.0 + np.log(np.array(counts, dtype=np.float32))
+
+        # 부드러운 IDF, 예시가 충분히 많으면 너무 흔한 n-gram은 색인에서 제외
+        doc_count = max(len(examples), 1)
+        df = np.bincount(term_ids, minlength=len(vocabulary))
+        self.idf = (np.log((1 + doc_count) / (1 + df)) + 1.0).astype(np.float32)
+        if doc_count >= 20:
+            self.idf[df > max_df * doc_count] = 0.0
+        keep = self.idf[term_ids] > 0
+        doc_ids, term_ids, tf = doc_ids[keep], term_ids[keep], tf[keep]
+        weights = tf * self.idf[term_ids]
+
+        # 예시 벡터 L2 정규화 → 점수는 코사인 유사도
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=len(examples)))
+        weights = weights / np.maximum(norms[doc_ids], 1e-12)
+
+        # n-gram 기준으로 정렬해 CSR 역색인 구성
+        order = np.argsort(term_ids, kind="stable")
+        self.postings_docs = doc_ids[order]
+        self.postings_weights = weights[order].astype(np.float32)
+        self.indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=self.indptr[1:])
+        self.vocabulary = vocabulary
+        self.build_seconds = time.perf_counter() - start_time
+
+    def __len__(self):
+        return len(self.examples)
+
+    def search(self, query, k=8):
+        """질의와 가장 비슷한 예시 k개 반환
+
+        Args:
+            query (str): 사용자 메시지
+            k (int): 반환할 예시 수
+
+        Returns:
+            list: (유사도, 예시) 목록 (유사도 내림차순, 0인 예시는 제외)
+        """
+        if not self.examples or k <= 0:
+            return []
+
+        counts = {}
+        for gram in char_ngrams(query, self.ngram_range):
+            term_id = self.vocabulary.get(gram)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if not counts:
+            return []
+
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        query_weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) \
+            * self.idf[term_ids]
+        query_weights /= max(float(np.sqrt(np.dot(query_weights, query_weights))), 1e-12)
+
+        # 질의 n-gram들의 역색인 목록을 한 번에 모아 예시별 점수 합산
+        starts = self.indptr[term_ids]
+        lengths = self.indptr[term_ids + 1] - starts
+        if not lengths.sum():
+            return []
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        scores = np.bincount(self.postings_docs[positions],
+                             weights=self.postings_weights[positions] * np.repeat(query_weights, lengths),
+                             minlength=len(self.examples))
+
+        k = min(k, len(self.examples))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.examples[i]) for i in top if scores[i] > 0]
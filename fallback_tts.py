@@ -0,0 +1,137 @@
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from audio_clip import AudioClip
+
+
+class LocalFallbackTTS:
+    def __init__(self, language="ko", rate=170, warmup=True):
+        """로컬 대체 TTS 엔진 초기화 (pyttsx3, Windows에서는 SAPI5)
+
+        네트워크 없이 동작하는 운영체제 음성 엔진을 시작 시 한 번만 로드해
+        두고, 주 엔진이 실패했을 때 곧바로 음성을 만들 수 있도록 합니다.
+        SAPI5(COM) 객체는 만든 스레드에서만 안전하게 쓸 수 있으므로, 엔진은
+        전용 작업 스레드에서 만들고 합성 요청은 큐로 그 스레드에 넘깁니다.
+
+        Args:
+            language (str): 선호하는 음성 언어 코드
+            rate (int): 말하기 속도 (분당 단어 수)
+            warmup (bool): 초기화 시 워밍업 합성 수행 여부
+        """
+        self.language = language
+        self.rate = rate
+        self.available = False
+        self._requests = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fallback-tts")
+        self._thread.start()
+        # 엔진 초기화가 끝날 때까지 대기 (available 설정)
+        self._ready.wait()
+
+        if self.available and warmup:
+            self.synthesize("준비 완료")
+
+    def _init_engine(self):
+        """작업 스레드에서 엔진 생성 (실패 시 None)"""
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+        except Exception as e:
+            print(f"로컬 대체 TTS 엔진을 사용할 수 없습니다: {e}")
+            return None
+
+        engine.setProperty("rate", self.rate)
+        voice = self._find_voice(engine, self.language)
+        if voice:
+            engine.setProperty("voice", voice.id)
+            print(f"로컬 대체 TTS 음성: {voice.name}")
+        else:
+            print(f"{self.language} 음성을 찾지 못해 기본 음성을 사용합니다.")
+        return engine
+
+    def _run(self):
+        # Windows에서는 이 스레드에 COM을 초기화해야 SAPI5 엔진을 만들고 쓸 수 있음
+        try:
+            import pythoncom
+        except ImportError:
+            pythoncom = None
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+
+        try:
+            engine = self._init_engine()
+            self.available = engine is not None
+            self._ready.set()
+            if engine is None:
+                return
+
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    break
+                text, future = request
+                if future.set_running_or_notify_cancel():
+                    future.set_result(self._synthesize_on_thread(engine, text))
+        finally:
+            self._ready.set()
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    @staticmethod
+    def _find_voice(engine, language):
+        for voice in engine.getProperty("voices"):
+            languages = [lang.decode(errors="ignore") if isinstance(lang, bytes) else str(lang)
+                         for lang in (voice.languages or [])]
+            descriptor = " ".join(languages + [voice.id, voice.name]).lower()
+            if language in languages or f"{language}-" in descriptor or "korean" in descriptor:
+                return voice
+        return None
+
+    def _synthesize_on_thread(self, engine, text):
+        # pyttsx3는 파일 출력만 지원하므로 WAV로 저장한 뒤 바로 읽고 지움
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            return AudioClip.from_file(path)
+        except Exception as e:
+            print(f"로컬 대체 TTS 합성 중 오류 발생: {e}")
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def synthesize(self, text, timeout=30.0):
+        """텍스트를 음성으로 변환 (어느 스레드에서 호출해도 엔진 스레드에서 합성)
+
+        Args:
+            text (str): 변환할 텍스트
+            timeout (float): 최대 대기 시간 (초)
+
+        Returns:
+            AudioClip: 합성된 음성 (실패 시 None)
+        """
+        if not self.available:
+            return None
+
+        future = Future()
+        self._requests.put((text, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            print("로컬 대체 TTS 합성 시간이 초과되었습니다.")
+            return None
+
+    def close(self):
+        """엔진 스레드 종료"""
+        if self._thread.is_alive():
+            self._requests.put(None)
+            self._thread.join(timeout=5)
+        self.available = False
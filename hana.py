@@ -1,36 +1,43 @@
 import os
 import argparse
-import json
-import time
 import random
 import google.generativeai as genai
-from pathlib import Path
 from speech_synthesis import GoogleTTS
 import pyaudio
-import wave
-import whisper
+import numpy as np
 import keyboard
 import threading
 from datetime import datetime
 from conversation_handler import ConversationHandler
 from realtime_stt import RealtimeSTT
+from model_registry import registry
+from audio_clip import resample
+from echo_gate import EchoGate
+from llm_stream import stream_reply
+from chat_session import HanaChat
+from example_retriever import ExampleRetriever
+from persona import load_examples, build_system_instruction
 import ui_handler
 
 # 글로벌 변수
 is_recording = False
 audio_frames = []
 CHUNK = 1024
-FORMAT = pyaudio.paInt16
+FORMAT = pyaudio.paFloat32
 CHANNELS = 1
-RATE = 44100
+RATE = 16000  # 음성 인식 모델 입력 형식 그대로 녹음
 is_muted = False  # 음소거 상태를 저장하는 전역 변수
+STT_BACKEND = "whisper"  # GPU가 없으면 "faster-whisper" (CPU int8 양자화 엔진)
+# 모드별 모델 크기 (레지스트리는 크기별로 인스턴스를 공유하므로 같은 크기면 한 번만 로드)
+VOICE_STT_MODEL_SIZE = "base"  # 음성 모드: 녹음이 끝난 뒤 한 번 인식하므로 가볍고 빠른 모델
+STREAMING_STT_MODEL_SIZE = "medium"  # 스트리밍 모드: 말하는 동안 계속 인식하므로 정확도 우선
 
 class VoiceRecorder:
-    def __init__(self, output_filename="temp_recording.wav"):
-        self.output_filename = output_filename
+    def __init__(self):
         self.p = pyaudio.PyAudio()
         self.stream = None
-        self.frames = []
+        self.buffer = bytearray()
+        self.capture_rate = RATE
         self.is_recording = False
         self._thread = None
 
@@ -38,39 +45,44 @@ class VoiceRecorder:
         if self.is_recording:
             return
         self.is_recording = True
-        self.frames = []
+        self.buffer = bytearray()
         self._thread = threading.Thread(target=self._record)
         self._thread.start()
 
+    def _open_stream(self):
+        # 장치가 16kHz를 지원하지 않으면 기본 샘플레이트로 녹음한 뒤 변환
+        try:
+            self.capture_rate = RATE
+            return self.p.open(format=FORMAT, channels=CHANNELS, rate=RATE,
+                               input=True, frames_per_buffer=CHUNK)
+        except OSError:
+            self.capture_rate = int(self.p.get_default_input_device_info()["defaultSampleRate"])
+            return self.p.open(format=FORMAT, channels=CHANNELS, rate=self.capture_rate,
+                               input=True, frames_per_buffer=CHUNK)
+
     def _record(self):
-        self.stream = self.p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK
-        )
+        self.stream = self._open_stream()
         while self.is_recording:
             data = self.stream.read(CHUNK)
-            self.frames.append(data)
+            self.buffer.extend(data)
 
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
 
-    def stop_recording_and_save(self):
+    def stop_recording(self):
+        """녹음을 멈추고 16kHz float32 모노 오디오 반환 (파일을 거치지 않음)"""
         if not self.is_recording:
-            return
+            return None
         self.is_recording = False
         self._thread.join()
 
-        wf = wave.open(self.output_filename, 'wb')
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(self.p.get_sample_size(FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(b''.join(self.frames))
-        wf.close()
+        # 녹음마다 새 버퍼를 쓰므로 복사 없이 그대로 배열로 사용
+        audio = np.frombuffer(self.buffer, dtype=np.float32)
+        if self.capture_rate != RATE:
+            audio = resample(audio, self.capture_rate, RATE)
+        return audio
 
     def close(self):
         self.p.terminate()
@@ -78,16 +90,10 @@ class VoiceRecorder:
 def setup_speech_synthesis(google_tts_api_key, rvc_lib_path):
     """음성 합성 시스템 초기화"""
     try:
-        import gtts
-    except ImportError:
-        print("gtts 패키지 설치 중...")
-        os.system("pip install gtts")
-    
-    try:
-        import pydub
+        import pyttsx3
     except ImportError:
-        print("pydub 패키지 설치 중...")
-        os.system("pip install pydub")
+        print("pyttsx3 패키지 설치 중...")
+        os.system("pip install pyttsx3")
     
     try:
         import playsound
@@ -117,72 +123,38 @@ def setup_gemini_model(api_key):
         "max_output_tokens": 1024,
     }
     
-    model = genai.GenerativeModel(model_name='gemini-2.5-flash-lite-preview-06-17',
-                                  generation_config=generation_config,
-                                  safety_settings=safety_settings)
-    
-    finetune_data = []
-    finetune_path = Path("hana_finetune.jsonl")
-    
-    if finetune_path.exists():
-        try:
-            with open(finetune_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            data = json.loads(line)
-                            finetune_data.append(data)
-                        except json.JSONDecodeError as e:
-                            print(f"잘못된 JSON 라인 무시: {line}")
-                            continue
-        except Exception as e:
-            print(f"파인튜닝 데이터 로드 중 오류 발생: {str(e)}")
-    
-    chat = model.start_chat(history=[])
-    
-    context = ""
-    for data in finetune_data:
-        context += f"User: {data['input']}\nAssistant: {data['output']}\n"
+    # 페르소나는 시스템 지시문으로 한 번만 전달하고, 예시 대화는 전부 붙이는 대신
+    # 메시지마다 비슷한 예시만 검색해 붙임 (페르소나만으로는 컨텍스트 캐시 최소 크기에
+    # 못 미쳐 HanaChat이 캐시 없이 보냄)
+    examples = load_examples("hana_finetune.jsonl")
+    retriever = ExampleRetriever(examples) if examples else None
+    if retriever:
+        print(f"예시 대화 {len(retriever)}개 색인 완료 ({retriever.build_seconds * 1000:.1f}ms)")
     
-    initial_prompt = f"""당신은 AI 스트리머 '하나'이며, 지금부터 반드시 이 설정을 지켜 말해야 합니다.
-
-- 당신의 이름: 엘리트 프로페서 하나.
-- 성격: 지적이고 논리적이지만 살짝 자만심 강한 교수형 AI. 가끔 허당미가 드러남.
-- 말투: "~합니다", "~입니다" 형태의 단정한 존댓말 사용. 간혹 통계와 데이터를 제시하며, 이를 근거로 농담하거나 상대방을 놀리기도 합니다.
-- 자신을 지칭할 때는 "본 교수", "하나 교수" 또는 "저"를 사용.
-- 사용자에게 항상 정중하지만, 유쾌한 농담을 종종 섞으며 가볍게 비꼬는 표현도 가능합니다.
-- 모든 응답은 반드시 교수 캐릭터의 성격과 말투를 유지하여 제공해야 합니다.
-- 정치, 종교, 경제와 같은 민감한 주제는 절대 다루지 않습니다.
-- 가끔 실수를 하면 데이터나 시스템 오류라고 핑계를 대며 능청스럽게 넘어갑니다.
-
-대화 예시:
-- 사용자: "와 이겼다, 나 좀 잘하지 않아?"
-- 하나: "기적적으로 승리할 확률이 9.4%였는데, 정말 대단하십니다. 다음엔 좀 더 높은 확률로 이기길 기대해보죠."
-
-특수 문자 사용 규칙:
-- 이모지, 물결표(~) 등 특수문자는 절대 사용하지 않습니다.
-- 쉼표와 마침표는 문장 구조상 꼭 필요한 경우에만 사용합니다.
-- 느낌표나 물음표 사용은 최대한 절제합니다.
-
-{context}
-지금부터 당신은 반드시 '엘리트 프로페서 하나'의 캐릭터로서만 답변합니다."""
-
-
     try:
-        chat.send_message(initial_prompt)
-        print("Gemini AI 초기화 성공!")
-        return chat
+        chat = HanaChat(model_name='gemini-2.5-flash-lite-preview-06-17',
+                        system_instruction=build_system_instruction(),
+                        generation_config=generation_config,
+                        safety_settings=safety_settings,
+                        retriever=retriever)
     except Exception as e:
         print(f"Gemini AI 초기화 오류: {str(e)}")
         print("Gemini API 키를 확인하고 다시 시도해주세요.")
         raise
 
-def process_voice_input(audio_file, whisper_model):
-    """음성 입력을 텍스트로 변환"""
+    # 토큰 수 비교는 참고용 네트워크 호출이므로 실패해도 시작은 계속함
     try:
-        result = whisper_model.transcribe(audio_file)
-        return result["text"].strip()
+        chat.report_prompt_tokens(legacy_instruction=build_system_instruction(examples))
+    except Exception as e:
+        print(f"프롬프트 토큰 수를 확인하지 못했습니다: {e}")
+    print("Gemini AI 초기화 성공!")
+    return chat
+
+def process_voice_input(audio):
+    """음성 입력을 텍스트로 변환 (모델은 처음 필요할 때 로드되어 공유됨)"""
+    try:
+        with registry.use(STT_BACKEND, model_size=VOICE_STT_MODEL_SIZE) as stt_engine:
+            return stt_engine.transcribe(audio, language=None)
     except Exception as e:
         print(f"음성 인식 중 오류 발생: {str(e)}")
         return None
@@ -256,9 +228,6 @@ def main():
         ui_handler.console.print(f"[bold red]Gemini 모델 설정 오류:[/bold red] {e}")
         return
     
-    ui_handler.display_status("음성 인식 모델 로드 중...")
-    whisper_model = whisper.load_model("base")
-    
     recorder = VoiceRecorder()
     
     chat_history = []
@@ -268,21 +237,28 @@ def main():
     if mode == "1":
         run_text_mode(tts, chat, chat_history)
     elif mode == "2":
-        run_voice_mode(tts, chat, whisper_model, recorder, chat_history)
+        run_voice_mode(tts, chat, recorder, chat_history)
     elif mode == "3":
         run_streaming_mode(tts, chat, youtube_api_key, chat_history)
     else:
         ui_handler.console.print("[bold red]잘못된 모드를 선택했습니다. 프로그램을 종료합니다.[/bold red]")
 
+    # 실행마다 남는 통계 파일은 metrics/ 아래에 모음 (git에서 제외)
+    os.makedirs("metrics", exist_ok=True)
+    tts.dump_metrics(os.path.join("metrics", f"tts_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+    tts.close()
+    print(f"음성 인식 모델 통계: {registry.stats()}")
+    registry.close()
+    print(f"Gemini 토큰 사용량: {chat.usage_stats()}")
+    chat.close()
+
 def run_text_mode(tts, chat, chat_history):
     ui_handler.console.print(Panel.fit("[bold cyan]텍스트 채팅 시작[/bold cyan]\n'종료'를 입력하면 대화가 종료됩니다."))
 
     start_message = "반갑습니다. 엘리트 프로페서 하나입니다. 본 교수와 함께하는 오늘의 연구를 시작해보도록 하죠."
 
     ui_handler.display_chat("하나", start_message, color="magenta")
-    audio_path = tts.synthesize_with_emotion(start_message, emotion="excited")
-    if audio_path:
-        tts.play_audio(audio_path)
+    tts.speak_streaming(start_message, emotion="excited")
 
     while True:
         user_input = ui_handler.get_user_input()
@@ -294,16 +270,13 @@ def run_text_mode(tts, chat, chat_history):
         emotion = get_emotion_from_text(user_input)
 
         try:
+            # 첫 문장이 생성되는 즉시 말하기 시작하고, 생성이 끝나면 전체 답변을 표시
             with ui_handler.console.status("[bold yellow]하나가 답변을 생성 중입니다...[/bold yellow]"):
-                response = chat.send_message(user_input)
-                ai_response = response.text
+                ai_response = stream_reply(chat, user_input, tts, emotion=emotion, wait=False)
 
             ui_handler.display_chat("하나", ai_response, color="magenta")
 
-            with ui_handler.console.status("[bold yellow]음성 합성 중...[/bold yellow]"):
-                audio_path = tts.synthesize_with_emotion(ai_response, emotion=emotion)
-            if audio_path:
-                tts.play_audio(audio_path)
+            tts.wait_until_done()
 
             chat_history.append({
                 "user": user_input,
@@ -316,38 +289,33 @@ def run_text_mode(tts, chat, chat_history):
     if chat_history:
         save_chat_history(chat_history)
 
-def run_voice_mode(tts, chat, whisper_model, recorder, chat_history):
+def run_voice_mode(tts, chat, recorder, chat_history):
     global is_muted
     ui_handler.console.print(Panel.fit("[bold cyan]음성 인식 모드 시작[/bold cyan]\n'스페이스바'를 누르고 있는 동안 음성이 녹음됩니다.\n'ESC'를 누르면 종료됩니다."))
 
     start_message = "반갑습니다. 엘리트 프로페서 하나입니다. 본 교수와 함께하는 오늘의 연구를 시작해보도록 하죠."
     ui_handler.display_chat("하나", start_message, color="magenta")
-    audio_path = tts.synthesize_with_emotion(start_message, emotion="excited")
-    if audio_path and not is_muted:
-        tts.play_audio(audio_path)
+    if not is_muted:
+        tts.speak_streaming(start_message, emotion="excited")
 
     def handle_voice_input():
         recorder.start_recording()
         ui_handler.console.print("[bold yellow]녹음 시작... (스페이스바를 떼면 종료)[/bold yellow]")
         keyboard.wait('space', suppress=True)
-        recorder.stop_recording_and_save()
+        audio = recorder.stop_recording()
         ui_handler.display_status("녹음 종료, 처리 중...")
 
-        text = process_voice_input(recorder.output_filename, whisper_model)
+        text = process_voice_input(audio)
         if text:
             ui_handler.display_chat("나 (음성)", text, color="green")
             emotion = get_emotion_from_text(text)
             try:
                 with ui_handler.console.status("[bold yellow]하나가 답변을 생성 중입니다...[/bold yellow]"):
-                    response = chat.send_message(text)
-                    ai_response = response.text
+                    ai_response = stream_reply(chat, text, tts, emotion=emotion, speak=not is_muted, wait=False)
                 
                 ui_handler.display_chat("하나", ai_response, color="magenta")
 
-                with ui_handler.console.status("[bold yellow]음성 합성 중...[/bold yellow]"):
-                    audio_path = tts.synthesize_with_emotion(ai_response, emotion=emotion)
-                if audio_path and not is_muted:
-                    tts.play_audio(audio_path)
+                tts.wait_until_done()
                 
                 chat_history.append({"user": text, "hana": ai_response})
             except Exception as e:
@@ -392,16 +360,20 @@ def run_streaming_mode(tts, chat, youtube_api_key, chat_history):
     with ui_handler.console.status("[bold yellow]채팅 리스너 설정 중...[/bold yellow]"):
         chat_listener = setup_chat_listener(channel_id, conversation_handler, platform=platform, api_key=youtube_api_key)
 
-    stt = RealtimeSTT(model_size="medium", language="ko")
+    # 말하는 동안 중간 인식 결과를 보여 주므로 발화 종료 판단 무음은 짧게 둠
+    # 하나의 목소리가 마이크로 다시 들어와 인식되지 않도록 재생 구간 동안의 발화는 버림
+    echo_gate = EchoGate()
+    echo_gate.attach(tts.player)
+    stt = RealtimeSTT(model_size=STREAMING_STT_MODEL_SIZE, language="ko", streaming=True, end_silence=1.0,
+                      backend=STT_BACKEND, echo_gate=echo_gate)
     stt.start()
 
     start_message = "반갑습니다. 엘리트 프로페서 하나입니다. 본 교수와 함께하는 오늘의 연구를 시작해보도록 하죠."
     ui_handler.display_chat("하나", start_message, color="magenta")
-    audio_path = tts.synthesize_with_emotion(start_message, emotion="excited")
-    if audio_path and not is_muted:
-        tts.play_audio(audio_path)
+    if not is_muted:
+        tts.speak_streaming(start_message, emotion="excited")
 
-    ui_handler.console.print(Panel.fit("[bold green]채팅 스트리밍 모드가 시작되었습니다.[/bold green]\n실시간 음성 인식이 활성화되었습니다. 말하면 하나가 반응합니다.\n'q'를 입력하면 종료됩니다."))
+    ui_handler.console.print(Panel.fit("[bold green]채팅 스트리밍 모드가 시작되었습니다.[/bold green]\n실시간 음성 인식이 활성화되었습니다. 말하면 하나가 반응합니다.\n'q'를 입력하면 종료됩니다. 's'를 입력하면 현재 발화를 중단합니다."))
 
     def user_input_thread():
         global is_muted
@@ -415,6 +387,14 @@ def run_streaming_mode(tts, chat, youtube_api_key, chat_history):
             elif cmd == 'm':
                 is_muted = not is_muted
                 print(f"\n음소거 {'활성화' if is_muted else '비활성화'}")
+            elif cmd == 's':
+                tts.stop_speaking()
+                print("\n현재 발화를 중단했습니다.")
+            elif cmd == 'stats':
+                print("\n" + tts.metrics.format_report())
+                print(f"자기 음성으로 건너뛴 인식: {echo_gate.stats()}")
+                print(f"대화 기록: {chat.conversation.stats()}")
+                print(f"응답 캐시: {conversation_handler.response_cache.stats()}")
             elif cmd.startswith("말해 "):
                 message = cmd[3:].strip()
                 if message:
@@ -429,8 +409,12 @@ def run_streaming_mode(tts, chat, youtube_api_key, chat_history):
 
     def speech_processing_thread():
         while chat_listener.running:
-            speech_result = stt.get_result()
-            if speech_result:
+            # 결과가 나오면 바로 깨어나고, 종료 여부 확인을 위해 가끔만 깨어남
+            event = stt.get_result(timeout=0.5)
+            if event and event["type"] == "partial":
+                print(f"\r(인식 중) {event['text']}", end="", flush=True)
+            elif event:
+                speech_result = event["text"]
                 print(f"\n사용자 음성: {speech_result}")
                 response = chat_listener.process_speech_input(speech_result)
                 if response:
@@ -438,7 +422,6 @@ def run_streaming_mode(tts, chat, youtube_api_key, chat_history):
                         "user": f"User (음성): {speech_result}",
                         "hana": response
                     })
-            time.sleep(0.1)
 
     input_thread = threading.Thread(target=user_input_thread)
     input_thread.daemon = True
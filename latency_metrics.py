@@ -0,0 +1,123 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class LatencyMetrics:
+    def __init__(self, window=500):
+        """단계별 지연 시간 수집기 초기화
+
+        단계마다 최근 window개의 소요 시간과 실시간 배율(RTF, 소요 시간 / 오디오 길이)을
+        보관하고, 실행 중 언제든 백분위수로 조회할 수 있습니다.
+
+        Args:
+            window (int): 단계별로 보관할 최근 측정값 수
+        """
+        self.window = window
+        self._durations = {}
+        self._rtfs = {}
+        self._totals = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @contextmanager
+    def measure(self, stage, audio_seconds=None):
+        """with 블록의 소요 시간을 stage로 기록
+
+        오디오 길이를 블록 안에서 알게 되면 yield된 딕셔너리의
+        "audio_seconds" 값을 채우면 됩니다.
+
+        Args:
+            stage (str): 단계 이름
+            audio_seconds (float, optional): 처리한 오디오 길이 (초)
+        """
+        info = {"audio_seconds": audio_seconds}
+        start_time = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(stage, time.perf_counter() - start_time, info["audio_seconds"])
+
+    def record(self, stage, seconds, audio_seconds=None):
+        """측정값 하나를 기록
+
+        Args:
+            stage (str): 단계 이름
+            seconds (float): 소요 시간 (초)
+            audio_seconds (float, optional): 처리한 오디오 길이 (초)
+        """
+        with self._lock:
+            if stage not in self._durations:
+                self._durations[stage] = deque(maxlen=self.window)
+                self._rtfs[stage] = deque(maxlen=self.window)
+                self._totals[stage] = 0
+            self._durations[stage].append(seconds)
+            self._totals[stage] += 1
+            if audio_seconds:
+                self._rtfs[stage].append(seconds / audio_seconds)
+
+    def increment(self, name, count=1):
+        """카운터 증가 (대체 엔진 사용 횟수 등)"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def snapshot(self):
+        """현재까지의 통계 반환
+
+        Returns:
+            dict: {"stages": {단계: 통계}, "counters": {이름: 값}}
+        """
+        with self._lock:
+            durations = {stage: np.array(values) for stage, values in self._durations.items()}
+            rtfs = {stage: np.array(values) for stage, values in self._rtfs.items()}
+            totals = dict(self._totals)
+            counters = dict(self._counters)
+
+        stages = {}
+        for stage, values in durations.items():
+            if not len(values):
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats = {
+                "count": totals[stage],
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(values.max()),
+            }
+            if len(rtfs[stage]):
+                rtf_p50, rtf_p95 = np.percentile(rtfs[stage], [50, 95])
+                stats["rtf_p50"] = float(rtf_p50)
+                stats["rtf_p95"] = float(rtf_p95)
+            stages[stage] = stats
+        return {"stages": stages, "counters": counters}
+
+    def format_report(self):
+        """사람이 읽기 쉬운 표 형태의 보고서 문자열 반환"""
+        snapshot = self.snapshot()
+        lines = [f"{'단계':<24}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'RTF p50':>9}"]
+        for stage, stats in sorted(snapshot["stages"].items()):
+            rtf = f"{stats['rtf_p50']:.2f}" if "rtf_p50" in stats else "-"
+            lines.append(f"{stage:<24}{stats['count']:>6}{stats['p50'] * 1000:>10.1f}"
+                         f"{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}{rtf:>9}")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """통계를 JSON 파일로 저장
+
+        Args:
+            path (str): 저장할 파일 경로
+        """
+        data = self.snapshot()
+        data["started_at"] = self.started_at
+        data["dumped_at"] = time.time()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,63 @@
+import time
+
+from sentence_splitter import stream_sentences
+
+
+def _chunk_texts(response, collected, on_text=None):
+    """스트리밍 응답에서 텍스트 조각을 꺼내며 collected에 모음"""
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # 안전 필터 등으로 텍스트가 없는 조각은 건너뜀
+            continue
+        collected.append(text)
+        if on_text:
+            on_text(text)
+        yield text
+
+
+def stream_reply(chat, message, tts=None, emotion="neutral", speak=True, wait=True, on_text=None, query=None,
+                 clips=None):
+    """Gemini 응답을 스트리밍으로 받아 문장이 완성될 때마다 바로 음성 합성
+
+    전체 응답을 기다리지 않고 첫 문장이 생성되는 즉시 TTS 요청을 보내므로
+    응답이 길어도 첫 음성까지의 시간은 첫 문장 생성 시간으로 줄어듭니다.
+
+    Args:
+        chat: HanaChat 또는 Gemini ChatSession (send_message(..., stream=True) 지원)
+        message (str): 보낼 메시지
+        tts (GoogleTTS, optional): 음성 합성 객체
+        emotion (str): 음성 감정
+        speak (bool): 음성으로 말할지 여부 (음소거 시 False)
+        wait (bool): 재생이 끝날 때까지 대기할지 여부
+        on_text (callable, optional): 텍스트 조각이 도착할 때마다 호출 (callback(text))
+        query (str, optional): 예시 대화 검색에 쓸 텍스트 (HanaChat 전용, 기본: message)
+        clips (list, optional): 응답 전체의 AudioClip을 순서대로 담을 목록 (중단되었거나 빠진 문장이 있으면 비워 둠)
+
+    Returns:
+        str: 전체 응답 텍스트
+    """
+    start_time = time.perf_counter()
+    if query is not None:
+        response = chat.send_message(message, stream=True, query=query)
+    else:
+        response = chat.send_message(message, stream=True)
+    collected = []
+
+    def timed_texts():
+        for text in _chunk_texts(response, collected, on_text):
+            if len(collected) == 1 and tts:
+                tts.metrics.record("llm_first_token", time.perf_counter() - start_time)
+            yield text
+        if tts:
+            tts.metrics.record("llm_response", time.perf_counter() - start_time)
+
+    if speak and tts:
+        played = tts.speak_sentences(stream_sentences(timed_texts()), emotion=emotion, wait=wait)
+        if clips is not None:
+            clips.extend(played)
+    else:
+        for _ in timed_texts():
+            pass
+    return "".join(collected)
@@ -0,0 +1,158 @@
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from stt_engines import create_engine
+
+
+def _resident_memory():
+    """현재 프로세스의 상주 메모리(바이트), psutil이 없으면 None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class ModelRegistry:
+    def __init__(self, idle_timeout=300.0):
+        """프로세스 전체에서 공유하는 음성 인식 모델 저장소 초기화
+
+        같은 설정(엔진, 크기, 장치)의 모델은 처음 요청될 때 한 번만 로드해
+        모든 사용처가 같은 인스턴스를 쓰고, 아무도 쓰지 않은 채 idle_timeout이
+        지나면 메모리에서 내립니다.
+
+        Args:
+            idle_timeout (float): 사용하지 않는 모델을 내리기까지 대기 시간 (초, None이면 내리지 않음)
+        """
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _key(backend, model_size, device, options):
+        return (backend, model_size, device, tuple(sorted(options.items())))
+
+    def acquire(self, backend="whisper", model_size="base", device=None, **options):
+        """모델을 가져옴 (처음이면 로드), 다 쓰면 release()로 반납
+
+        Args:
+            backend (str): 음성 인식 엔진 이름
+            model_size (str): 모델 크기
+            device (str, optional): 사용할 장치
+            **options: 엔진별 추가 설정
+
+        Returns:
+            STTEngine: 공유 엔진 인스턴스
+        """
+        key = self._key(backend, model_size, device, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                rss_before = _resident_memory()
+                start_time = time.perf_counter()
+                engine = create_engine(backend, model_size=model_size, device=device, **options)
+                load_seconds = time.perf_counter() - start_time
+                rss_after = _resident_memory()
+                entry = {
+                    "engine": engine,
+                    "refs": 0,
+                    "uses": 0,
+                    "load_seconds": load_seconds,
+                    "rss_delta_bytes": rss_after - rss_before if rss_before is not None else None,
+                    "loaded_at": time.time(),
+                }
+                self._entries[key] = entry
+                print(f"음성 인식 모델 로드 완료: {backend}/{model_size} ({load_seconds:.1f}초)")
+            entry["refs"] += 1
+            entry["uses"] += 1
+            entry["last_used"] = time.monotonic()
+            self._start_reaper()
+            return entry["engine"]
+
+    def release(self, engine):
+        """acquire()로 가져온 모델 반납"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry["engine"] is engine:
+                    entry["refs"] = max(0, entry["refs"] - 1)
+                    entry["last_used"] = time.monotonic()
+                    return
+
+    @contextmanager
+    def use(self, backend="whisper", model_size="base", device=None, **options):
+        """with 블록 동안만 모델을 빌려 씀"""
+        engine = self.acquire(backend, model_size, device, **options)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def unload_idle(self, max_idle=None):
+        """max_idle 이상 사용되지 않은 모델을 내림
+
+        Returns:
+            int: 내린 모델 수
+        """
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            idle_keys = [key for key, entry in self._entries.items()
+                         if entry["refs"] == 0 and now - entry["last_used"] >= max_idle]
+            for key in idle_keys:
+                del self._entries[key]
+                print(f"사용하지 않는 음성 인식 모델 해제: {key[0]}/{key[1]}")
+        if idle_keys:
+            gc.collect()
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except ImportError:
+                pass
+        return len(idle_keys)
+
+    def _start_reaper(self):
+        if self.idle_timeout is None or (self._reaper and self._reaper.is_alive()):
+            return
+        self._reaper = threading.Thread(target=self._reap, daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        interval = max(1.0, self.idle_timeout / 4)
+        while not self._stop_event.wait(interval):
+            self.unload_idle()
+
+    def stats(self):
+        """로드된 모델과 메모리 통계 반환
+
+        Returns:
+            dict: {"models": {"엔진/크기": 통계}, "rss_bytes": 현재 상주 메모리}
+        """
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                f"{key[0]}/{key[1]}": {
+                    "refs": entry["refs"],
+                    "uses": entry["uses"],
+                    "load_seconds": entry["load_seconds"],
+                    "rss_delta_bytes": entry["rss_delta_bytes"],
+                    "idle_seconds": now - entry["last_used"],
+                }
+                for key, entry in self._entries.items()
+            }
+        return {"models": models, "rss_bytes": _resident_memory()}
+
+    def close(self):
+        """유휴 해제 스레드를 멈추고 모든 모델을 내림"""
+        self._stop_event.set()
+        with self._lock:
+            self._entries.clear()
+        gc.collect()
+
+
+# 프로세스 전체에서 공유하는 기본 저장소
+registry = ModelRegistry()
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+# 하나의 성격/말투 설정 (예시 대화는 별도로 붙임)
+PERSONA_PROMPT = """당신은 AI 스트리머 '하나'이며, 지금부터 반드시 이 설정을 지켜 말해야 합니다.
+
+- 당신의 이름: 엘리트 프로페서 하나.
+- 성격: 지적이고 논리적이지만 살짝 자만심 강한 교수형 AI. 가끔 허당미가 드러남.
+- 말투: "~합니다", "~입니다" 형태의 단정한 존댓말 사용. 간혹 통계와 데이터를 제시하며, 이를 근거로 농담하거나 상대방을 놀리기도 합니다.
+- 자신을 지칭할 때는 "본 교수", "하나 교수" 또는 "저"를 사용.
+- 사용자에게 항상 정중하지만, 유쾌한 농담을 종종 섞으며 가볍게 비꼬는 표현도 가능합니다.
+- 모든 응답은 반드시 교수 캐릭터의 성격과 말투를 유지하여 제공해야 합니다.
+- 정치, 종교, 경제와 같은 민감한 주제는 절대 다루지 않습니다.
+- 가끔 실수를 하면 데이터나 시스템 오류라고 핑계를 대며 능청스럽게 넘어갑니다.
+
+대화 예시:
+- 사용자: "와 이겼다, 나 좀 잘하지 않아?"
+- 하나: "기적적으로 승리할 확률이 9.4%였는데, 정말 대단하십니다. 다음엔 좀 더 높은 확률로 이기길 기대해보죠."
+
+특수 문자 사용 규칙:
+- 이모지, 물결표(~) 등 특수문자는 절대 사용하지 않습니다.
+- 쉼표와 마침표는 문장 구조상 꼭 필요한 경우에만 사용합니다.
+- 느낌표나 물음표 사용은 최대한 절제합니다."""
+
+PERSONA_CLOSING = "지금부터 당신은 반드시 '엘리트 프로페서 하나'의 캐릭터로서만 답변합니다."
+
+
+def load_examples(path="hana_finetune.jsonl"):
+    """파인튜닝 예시 대화 읽기
+
+    Args:
+        path (str): {"input": ..., "output": ...} 형식의 jsonl 파일 경로
+
+    Returns:
+        list: 예시 딕셔너리 목록 (파일이 없으면 빈 목록)
+    """
+    examples = []
+    finetune_path = Path(path)
+    if not finetune_path.exists():
+        return examples
+
+    try:
+        with open(finetune_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    examples.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"잘못된 JSON 라인 무시: {line}")
+    except Exception as e:
+        print(f"파인튜닝 데이터 로드 중 오류 발생: {str(e)}")
+    return examples
+
+
+def format_examples(examples):
+    """예시 대화를 프롬프트용 텍스트로 변환"""
+    return "".join(f"User: {data['input']}\nAssistant: {data['output']}\n" for data in examples)
+
+
+def build_system_instruction(examples=()):
+    """페르소나 설정과 예시 대화를 합친 시스템 지시문 (예시 없이 페르소나만도 가능)"""
+    if not examples:
+        return f"{PERSONA_PROMPT}\n\n{PERSONA_CLOSING}"
+    return f"{PERSONA_PROMPT}\n\n{format_examples(examples)}\n{PERSONA_CLOSING}"
+
+
+def build_user_message(message, examples):
+    """메시지와 비슷한 예시 대화를 메시지 앞에 붙여 이번 턴에만 참고하도록 함"""
+    if not examples:
+        return message
+    return f"참고할 대화 예시:\n{format_examples(examples)}\n메시지:\n{message}"
@@ -1,31 +1,90 @@
 import numpy as np
-import sounddevice as sd
-import whisper
 import queue
 import threading
-import torch
 import time
+from collections import deque
+
+from audio_sources import MicrophoneSource
+from latency_metrics import LatencyMetrics
+from ring_buffer import AudioRingBuffer
+from model_registry import registry
+from vad import VoiceActivityDetector
+
+
+def _common_prefix(first, second):
+    """두 단어 목록의 공통 접두 단어 목록"""
+    prefix = []
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        prefix.append(a)
+    return prefix
 
 class RealtimeSTT:
-    def __init__(self, model_size="medium", language="ko", device="cuda"):
-        print("Whisper 모델 로딩 중...")
-        self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, model_size="medium", language="ko", device=None, end_silence=3.0,
+                 min_speech_duration=0.5, pre_roll=0.3, dedupe=True, vad=None, buffer_seconds=60.0,
+                 max_pending=3, overflow="merge", metrics=None, streaming=False, partial_interval=1.0,
+                 partial_window=8.0, backend="whisper", source=None, echo_gate=None, **engine_options):
+        print(f"음성 인식 모델 로딩 중... ({backend}, {model_size})")
+        # 같은 설정의 모델은 음성 모드 등 다른 사용처와 한 인스턴스를 공유
+        self._engine_config = dict(backend=backend, model_size=model_size, device=device, **engine_options)
+        self.engine = registry.acquire(**self._engine_config)
+        self.device = self.engine.device
         print(f"사용 장치: {self.device}")
-        self.model = whisper.load_model(model_size, device=self.device)
         self.language = language
         self.audio_queue = queue.Queue()
         self.result_queue = queue.Queue()
         self.running = False
-        self.silence_threshold = 0.01
-        self.silence_counter = 0
-        self.max_silence = 30
         self.sample_rate = 16000
         self.block_size = 1600
-        self.buffer = []
-        self.min_speech_duration = 0.5
+        # 오디오 입력 (기본은 마이크, 벤치마크에서는 WAV 파일 재생 등으로 교체)
+        self.source = source or MicrophoneSource(self.sample_rate, self.block_size)
+        # 녹음 콜백이 바로 쓰는 고정 크기 버퍼 (발화는 절대 위치 구간으로 다룸)
+        self.ring = AudioRingBuffer(buffer_seconds, self.sample_rate)
+        self._utterance_start = None
+        self.min_speech_duration = min_speech_duration
         self.is_speaking = False
+        self.dedupe = dedupe
         self.last_text = None  # 중복 방지를 위한 변수 추가
-        print("Whisper 모델 로딩 완료")
+
+        # 프레임 단위 VAD (적응형 잡음 바닥 + 히스테리시스)
+        self.vad = vad or VoiceActivityDetector(sample_rate=self.sample_rate,
+                                                end_silence=end_silence,
+                                                min_speech_duration=min_speech_duration)
+        # 발화 시작 직전 오디오까지 포함해 첫 음절이 잘리지 않도록 함
+        self.pre_roll_samples = int(pre_roll * self.sample_rate)
+
+        # 인식은 전용 작업 스레드 하나가 순서대로 처리하고, 대기열이 가득 차면
+        # overflow 정책("merge": 가장 최근 대기 발화와 합침, "drop_oldest": 가장 오래된 발화 버림)을 적용
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.metrics = metrics or LatencyMetrics()
+        self._pending = deque()
+        self._pending_condition = threading.Condition()
+        self.peak_queue_depth = 0
+        self._transcribing = False
+        self._processed_position = 0
+
+        # 하나가 말하는 동안 들어온 발화(스피커 소리)는 인식하지 않음
+        self.echo_gate = echo_gate
+        self._clock = (0, time.monotonic())
+
+        # 스트리밍 모드: 말하는 동안 partial_interval마다 지금까지의 발화를 다시 인식해
+        # 연속 두 가설이 일치하는 앞부분을 확정하는 방식(local agreement)으로 중간 결과 전달
+        # 다시 인식하는 구간이 partial_window를 넘으면 그 구간의 가설을 확정하고 이후 오디오만 인식
+        # (긴 발화에서도 중간 인식 비용이 발화 길이에 비례해 늘지 않음, 최종 인식은 발화 전체로 수행)
+        self.streaming = streaming
+        self.partial_samples = int(partial_interval * self.sample_rate)
+        self.partial_window_samples = int(partial_window * self.sample_rate)
+        self._utterance_id = 0
+        self._last_partial_at = 0
+        self._partial_request = None
+        self._partial_state = {}
+
+        # 결과 전달: 콜백이 등록되어 있으면 콜백으로, 없으면 get_result()용 큐로
+        self._result_callbacks = []
+        self._stop_event = threading.Event()
+        print("음성 인식 모델 로딩 완료")
     
     def start(self):
         """음성 인식 시작"""
@@ -33,6 +92,15 @@ class RealtimeSTT:
             return
         
         self.running = True
+        self._stop_event.clear()
+        # 이전 실행에서 남은 블록은 버리고 VAD 위치를 버퍼 끝에 맞춤
+        self.audio_queue = queue.Queue()
+        self.vad.reset(self.ring.position)
+        self._processed_position = self.ring.position
+        self.is_speaking = False
+        self._utterance_start = None
+        if self.engine is None:
+            self.engine = registry.acquire(**self._engine_config)
         
         # 오디오 레코딩 스레드 시작
         self.record_thread = threading.Thread(target=self._record_audio)
@@ -44,129 +112,326 @@ class RealtimeSTT:
         self.process_thread.daemon = True
         self.process_thread.start()
         
+        # 인식 작업 스레드 시작
+        self.transcribe_thread = threading.Thread(target=self._transcription_worker)
+        self.transcribe_thread.daemon = True
+        self.transcribe_thread.start()
+        
         print("실시간 음성 인식 시작")
     
     def stop(self):
         """음성 인식 중지"""
         self.running = False
+        self._stop_event.set()
+        self.audio_queue.put(None)  # 음성 처리 스레드 깨우기
         
-        # 남은 오디오 처리
-        if self.buffer:
-            audio_data = np.concatenate(self.buffer)
+        # 남은 오디오를 대기열에 넣고, 작업 스레드가 대기열을 비운 뒤 종료할 때까지 대기
+        if self._utterance_start is not None:
+            audio_data = self.ring.read(self._utterance_start, self.ring.position)
+            self._utterance_start = None
             if len(audio_data) / self.sample_rate >= self.min_speech_duration:
-                self._transcribe(audio_data)
+                self._enqueue_utterance(audio_data)
+        
+        if hasattr(self, "transcribe_thread") and self.transcribe_thread.is_alive():
+            with self._pending_condition:
+                self._pending.append(None)  # 작업 스레드 종료 표시
+                self._pending_condition.notify_all()
+            self.transcribe_thread.join()
+        
+        # 모델 반납 (다른 곳에서 쓰지 않으면 유휴 시간이 지난 뒤 메모리에서 내려감)
+        if self.engine is not None:
+            registry.release(self.engine)
+            self.engine = None
         
         print("실시간 음성 인식 중지")
     
-    def get_result(self):
-        """인식 결과 가져오기"""
-        if not self.result_queue.empty():
-            return self.result_queue.get()
-        return None
+    @property
+    def queue_depth(self):
+        """인식을 기다리는 발화 수"""
+        with self._pending_condition:
+            return len(self._pending)
+
+    def stats(self):
+        """음성 감지 통계(오검출로 건너뛴 인식 횟수 포함), 오디오 버퍼 통계와
+        인식 대기열 통계(대기 시간, 인식 시간, 버리거나 합친 발화 수) 반환"""
+        return {
+            "vad": self.vad.stats(),
+            "buffer": self.ring.stats(),
+            "queue": {"depth": self.queue_depth, "peak_depth": self.peak_queue_depth,
+                      "max_pending": self.max_pending},
+            "latency": self.metrics.snapshot(),
+            "echo": self.echo_gate.stats() if self.echo_gate else None,
+        }
+
+    def add_result_callback(self, callback):
+        """인식 결과가 나올 때마다 호출할 콜백 추가 (callback(result), 인식 작업 스레드에서 호출)
+
+        콜백이 하나라도 등록되면 결과는 get_result() 큐에 쌓이지 않습니다.
+        """
+        self._result_callbacks.append(callback)
+
+    def get_result(self, timeout=0):
+        """인식 결과 가져오기
+
+        Args:
+            timeout (float, optional): 결과를 기다릴 최대 시간 (초). 0이면 바로 반환,
+                None이면 결과가 나올 때까지 대기
+
+        Returns:
+            인식 결과 (없으면 None)
+
+        스트리밍 모드에서는 텍스트 대신 이벤트 딕셔너리를 반환합니다:
+        {"type": "partial" 또는 "final", "utterance": 발화 번호, "text": 전체 텍스트}.
+        partial 이벤트에는 확정된 앞부분 "committed"와 아직 바뀔 수 있는 뒷부분
+        "unstable"이 함께 들어 있습니다.
+        """
+        try:
+            return self.result_queue.get(block=timeout != 0, timeout=timeout or None)
+        except queue.Empty:
+            return None
+    
+    def _emit(self, result):
+        """인식 결과를 콜백 또는 결과 큐로 전달"""
+        if not self._result_callbacks:
+            self.result_queue.put(result)
+            return
+        for callback in self._result_callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"인식 결과 콜백 오류: {e}")
+    
+    def wait_idle(self, timeout=None):
+        """받은 오디오를 모두 처리하고 진행 중인 발화와 인식이 없을 때까지 대기
+
+        Args:
+            timeout (float, optional): 최대 대기 시간 (초)
+
+        Returns:
+            bool: 제한 시간 안에 유휴 상태가 되었는지 여부
+        """
+        with self._pending_condition:
+            return self._pending_condition.wait_for(
+                lambda: (self._processed_position >= self.ring.position and not self.is_speaking
+                         and not self._pending and not self._transcribing
+                         and self._partial_request is None),
+                timeout=timeout)
+    
+    def _on_audio(self, block):
+        """오디오 입력 콜백: 링 버퍼에 바로 기록하고 구간만 전달"""
+        if not self.running:
+            return
+        start, end = self.ring.write(block)
+        self._clock = (end, time.monotonic())
+        self.audio_queue.put((start, end))
+    
+    def _position_time(self, position):
+        """절대 샘플 위치를 녹음 시각(time.monotonic 기준)으로 변환"""
+        clock_position, clock_time = self._clock
+        return clock_time - (clock_position - position) / self.sample_rate
     
     def _record_audio(self):
-        """마이크에서 오디오 녹음"""
-        def audio_callback(indata, frames, time, status):
-            """오디오 입력 콜백"""
-            if not self.running:
-                return
-            
-            # 모노로 변환
-            audio_data = indata[:, 0].copy()
-            self.audio_queue.put(audio_data)
-        
-        # 오디오 스트림 시작
-        with sd.InputStream(callback=audio_callback, 
-                           channels=1, 
-                           samplerate=self.sample_rate,
-                           blocksize=self.block_size):
-            while self.running:
-                time.sleep(0.1)
+        """오디오 소스에서 입력 받기 (중지될 때까지)"""
+        self.source.run(self._on_audio, self._stop_event)
     
     def _process_audio(self):
-        """오디오 처리 및 음성 감지 (최적화 버전)"""
+        """오디오 처리 및 음성 감지 (VAD 기반)"""
         while self.running:
-            if not self.audio_queue.empty():
-                # 오디오 데이터 가져오기
-                audio_data = self.audio_queue.get()
-                
-                # 볼륨 레벨 계산
-                volume_level = np.abs(audio_data).mean()
-                
-                # 음성 감지
-                if volume_level > self.silence_threshold:
-                    # 음성 감지됨
-                    if not self.is_speaking:
-                        # 발화 시작
-                        self.is_speaking = True
-                        print("음성 감지 시작...")
-                    
-                    self.silence_counter = 0
-                    self.buffer.append(audio_data)
+            # 새로 기록된 구간 (대부분 복사 없는 뷰), 들어올 때까지 대기
+            item = self.audio_queue.get()
+            if item is None:
+                break
+            block_start, block_end = item
+            audio_data = self.ring.read(block_start, block_end, copy=False)
+
+            for event, position in self.vad.process(audio_data):
+                if event == "start":
+                    # 발화 시작: 직전 오디오부터 발화 구간 시작
+                    self.is_speaking = True
+                    self._utterance_start = max(position - self.pre_roll_samples, self.ring.oldest)
+                    self._utterance_id += 1
+                    self._last_partial_at = position
+                    print("음성 감지 시작...")
+                elif event == "reject":
+                    # 짧은 잡음으로 판단된 발화는 인식하지 않고 버림
+                    self.is_speaking = False
+                    self._utterance_start = None
+                    print("잡음으로 판단되어 무시")
                 else:
-                    # 무음 감지됨
-                    if self.is_speaking and self.buffer:
-                        # 무음 카운터 증가
-                        self.silence_counter += 1
-                        self.buffer.append(audio_data)  # 잠시 동안의 무음도 버퍼에 추가
-                        
-                        # 무음이 일정 기간 지속되면 즉시 처리
-                        if self.silence_counter >= self.max_silence:
-                            # 발화 종료 감지
-                            self.is_speaking = False
-                            
-                            # 모든 오디오 데이터 결합
-                            full_audio = np.concatenate(self.buffer)
-                            
-                            # 최소 길이 확인 (더 짧은 발화도 허용)
-                            duration = len(full_audio) / self.sample_rate
-                            if duration >= self.min_speech_duration:
-                                print(f"음성 감지 종료 (길이: {duration:.2f}초) - 처리 중...")
-                                # 별도 스레드에서 처리하여 대기 시간 감소
-                                threading.Thread(
-                                    target=self._transcribe, 
-                                    args=(full_audio,),
-                                    daemon=True
-                                ).start()
-                            else:
-                                print(f"너무 짧은 음성 무시 ({duration:.2f}초)")
-                            
-                            # 버퍼 초기화
-                            self.buffer = []
-            else:
-                time.sleep(0.01)
+                    # 발화 종료: 종료 위치까지 한 번만 복사해 인식
+                    self.is_speaking = False
+                    start_position, self._utterance_start = self._utterance_start, None
+                    # 종료 판단에 쓰인 무음 구간은 빼고 실제 음성 구간으로 겹침 판단
+                    speech_end = max(start_position, position - self.vad.hangover_frames * self.vad.frame_length)
+                    if self.echo_gate and self.echo_gate.should_skip(self._position_time(start_position),
+                                                                     self._position_time(speech_end)):
+                        self.metrics.increment("stt_echo_skipped")
+                        print("하나의 음성과 겹치는 발화 무시")
+                        continue
+                    full_audio = self.ring.read(start_position, position)
+                    duration = len(full_audio) / self.sample_rate
+                    print(f"음성 감지 종료 (길이: {duration:.2f}초) - 처리 중...")
+                    self._enqueue_utterance(full_audio)
+
+            # 말하는 도중이면 일정 간격으로 중간 인식 요청 (가장 최근 요청만 유지)
+            if (self.streaming and self.is_speaking and block_end - self._last_partial_at >= self.partial_samples
+                    and not (self.echo_gate and self.echo_gate.is_speaking)):
+                self._last_partial_at = block_end
+                partial_start = self._partial_start()
+                self._request_partial(self.ring.read(partial_start, block_end), partial_start, block_end)
+            
+            with self._pending_condition:
+                self._processed_position = block_end
+                self._pending_condition.notify_all()
     
-    def _transcribe(self, audio_data):
-        """Whisper를 사용하여 오디오 인식 (최적화 버전)"""
-        try:
-            # 오디오 데이터를 float32로 변환
-            audio_data = audio_data.astype(np.float32)
+    def _enqueue_utterance(self, audio_data):
+        """발화를 인식 대기열에 추가 (가득 차면 overflow 정책 적용)"""
+        enqueued_at = time.perf_counter()
+        with self._pending_condition:
+            if len(self._pending) >= self.max_pending and self._pending[-1] is not None:
+                if self.overflow == "merge":
+                    # 바로 앞 발화와 이어 붙여 한 번에 인식 (대기 시간은 앞 발화 기준)
+                    previous_audio, enqueued_at, _ = self._pending.pop()
+                    audio_data = np.concatenate((previous_audio, audio_data))
+                    self.metrics.increment("stt_merged")
+                    print("인식 대기열이 가득 차 직전 발화와 합쳐서 처리")
+                else:
+                    self._pending.popleft()
+                    self.metrics.increment("stt_dropped")
+                    print("인식 대기열이 가득 차 가장 오래된 발화를 버림")
+            self._pending.append((audio_data, enqueued_at, self._utterance_id))
+            self.peak_queue_depth = max(self.peak_queue_depth, len(self._pending))
+            # 이 발화의 중간 인식은 더 이상 필요 없음
+            self._partial_request = None
+            self._pending_condition.notify()
+
+    def _partial_start(self):
+        """현재 발화에서 중간 인식할 구간의 시작 위치 (이미 확정된 구간 다음부터)"""
+        with self._pending_condition:
+            state = self._partial_state
+            if state.get("utterance") == self._utterance_id:
+                return state["start"]
+        return self._utterance_start
+
+    def _request_partial(self, audio_data, start, end):
+        """중간 인식 요청 (이전 요청이 아직 처리되지 않았으면 교체)"""
+        with self._pending_condition:
+            if self._partial_request is not None:
+                self.metrics.increment("stt_partial_skipped")
+            self._partial_request = (audio_data, self._utterance_id, start, end)
+            self._pending_condition.notify()
+
+    def _transcription_worker(self):
+        """대기열의 발화를 하나씩 순서대로 인식 (최종 인식을 중간 인식보다 우선)"""
+        while True:
+            with self._pending_condition:
+                self._pending_condition.wait_for(lambda: self._pending or self._partial_request)
+                if self._pending:
+                    item = self._pending.popleft()
+                    partial = None
+                else:
+                    item = partial = self._partial_request
+                    self._partial_request = None
+                self._transcribing = item is not None
+            if item is None:
+                break
             
-            # 음량 정규화
-            if np.abs(audio_data).max() > 0:
-                audio_data = audio_data / np.abs(audio_data).max()
+            if partial:
+                audio_data, utterance_id, start, end = partial
+                with self.metrics.measure("stt_partial", len(audio_data) / self.sample_rate):
+                    self._transcribe_partial(audio_data, utterance_id, start, end)
+                self._finish_job()
+                continue
             
-            # Whisper 모델로 인식 (최적화된 설정)
-            result = self.model.transcribe(
-                audio_data, 
-                language=self.language,
-                fp16=torch.cuda.is_available(),
-                initial_prompt="안녕하세요",  # 한국어 인식 개선
-                beam_size=1,  # 속도 최적화
-                best_of=1,    # 속도 최적화
-            )
+            audio_data, enqueued_at, utterance_id = item
+            self.metrics.record("stt_queue_wait", time.perf_counter() - enqueued_at)
+            with self.metrics.measure("stt_transcribe", len(audio_data) / self.sample_rate):
+                self._transcribe(audio_data, utterance_id)
+            self._finish_job()
+    
+    def _finish_job(self):
+        with self._pending_condition:
+            self._transcribing = False
+            self._pending_condition.notify_all()
+    
+    def _transcribe_partial(self, audio_data, utterance_id, start, end):
+        """말하는 도중의 오디오(start~end 구간)를 인식해 확정된 앞부분과 중간 결과 전달"""
+        try:
+            words = self._decode(audio_data).split()
+        except Exception as e:
+            print(f"중간 음성 인식 오류: {e}")
+            return
+        
+        with self._pending_condition:
+            # 이미 최종 인식이 요청된 발화면 버림
+            if utterance_id != self._utterance_id or not self.is_speaking:
+                return
+            state = self._partial_state
+            if state.get("utterance") != utterance_id:
+                state.clear()
+                state.update(utterance=utterance_id, start=start, frozen=[], previous=[], committed=[])
+            # 이미 확정하고 넘어간 구간부터 인식한 요청은 버림
+            if start != state["start"]:
+                return
+            
+            # 연속 두 가설이 일치하는 부분까지 확정 (확정된 부분은 줄어들지 않음)
+            agreed = _common_prefix(state["previous"], words)
+            if len(agreed) > len(state["committed"]):
+                state["committed"] = agreed
+            state["previous"] = words
+            segment_committed = state["committed"]
+            unstable = words[len(segment_committed):] if words[:len(segment_committed)] == segment_committed else words
+            committed = state["frozen"] + segment_committed
             
-            # 결과 추출
-            text = result["text"].strip()
+            # 구간이 partial_window를 넘으면 이번 가설을 모두 확정하고 다음 요청부터는 end 이후만 인식
+            # (경계에 걸친 단어는 잘릴 수 있지만 최종 인식이 발화 전체로 다시 인식함)
+            if end - start >= self.partial_window_samples:
+                state.update(start=end, frozen=committed + unstable, previous=[], committed=[])
+        
+        committed_text = " ".join(committed)
+        unstable_text = " ".join(unstable)
+        self._emit({
+            "type": "partial",
+            "utterance": utterance_id,
+            "text": " ".join(filter(None, [committed_text, unstable_text])),
+            "committed": committed_text,
+            "unstable": unstable_text,
+        })
+    
+    def _decode(self, audio_data):
+        """오디오를 정규화해 음성 인식 엔진으로 인식하고 텍스트 반환"""
+        # 오디오 데이터를 float32로 변환 (링 버퍼에서 이미 복사된 배열이면 그대로 사용)
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        
+        # 음량 정규화 (제자리 연산으로 추가 할당 없음)
+        peak = np.abs(audio_data).max() if len(audio_data) else 0
+        if peak > 0:
+            audio_data /= peak
+        
+        # 음성 인식 엔진으로 인식 (최적화된 설정)
+        return self.engine.transcribe(
+            audio_data,
+            language=self.language,
+            initial_prompt="안녕하세요",  # 한국어 인식 개선
+            beam_size=1,  # 속도 최적화
+        )
+    
+    def _transcribe(self, audio_data, utterance_id=None):
+        """음성 인식 엔진을 사용하여 오디오 인식 (최적화 버전)"""
+        try:
+            text = self._decode(audio_data)
             
             # 중복 입력 방지
-            if hasattr(self, 'last_text') and self.last_text == text:
+            if self.dedupe and self.last_text == text:
                 print(f"중복 텍스트 무시: {text}")
                 return
             
             if text:  # 빈 텍스트가 아닌 경우에만
                 print(f"인식된 텍스트: {text}")
-                self.result_queue.put(text)
+                if self.streaming:
+                    self._emit({"type": "final", "utterance": utterance_id, "text": text})
+                else:
+                    self._emit(text)
                 self.last_text = text  # 마지막 텍스트 저장
             else:
                 print("인식된 텍스트 없음")
@@ -0,0 +1,193 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+
+def normalize_message(text):
+    """캐시 비교용 메시지 (소문자, 문장부호/공백 제거, 같은 글자 반복은 두 번까지)"""
+    text = re.sub(r"[^\w]", "", text.lower())
+    return re.sub(r"(.)\1{2,}", r"\1\1", text)
+
+
+# 부정 표현 유무가 다른 메시지는 글자가 거의 같아도 뜻이 반대이므로 비슷한 메시지로 보지 않음
+_NEGATION = re.compile(r"아니|않|못|없")
+
+
+def has_negation(text):
+    """정규화된 메시지에 부정 표현이 있는지 여부"""
+    return bool(_NEGATION.search(text))
+
+
+# 비슷한 메시지끼리 달라도 되는 글자 (어미/조사/높임 표현), 그 밖의 글자가 다르면 다른 질문으로 봄
+_ENDING_CHARS = set("요용여염세셔에예이야가은는을를도죠지까니다어아해하나돼되시습읍")
+# 메시지 앞에 붙거나 빠져도 되는 호칭
+_ADDRESS_PREFIXES = ("하나교수님", "교수님", "하나")
+
+
+def only_endings_differ(a, b):
+    """정규화된 두 메시지가 어미/조사나 앞의 호칭만 다른지 여부
+
+    "롤 티어 뭐예요"와 "발로 티어 뭐예요"처럼 글자는 많이 겹쳐도 핵심 단어가
+    다른 질문은 False입니다.
+    """
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        changed = a[i1:i2] + b[j1:j2]
+        if i1 == 0 and j1 == 0 and tag in ("insert", "delete") and changed in _ADDRESS_PREFIXES:
+            continue
+        if not set(changed) <= _ENDING_CHARS:
+            return False
+    return True
+
+
+def shingles(text, size=2):
+    """정규화된 메시지의 글자 shingle 집합 (짧은 메시지는 전체를 하나로)"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class CachedResponse:
+    """캐시에 저장된 응답 텍스트와 합성된 음성"""
+
+    def __init__(self, key, message, text, clips, shingle_set):
+        self.key = key
+        self.message = message
+        self.text = text
+        self.clips = list(clips)
+        self.shingles = shingle_set
+        self.negated = has_negation(key)
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+
+class ResponseCache:
+    def __init__(self, ttl=600, similarity=0.55, max_entries=64, shingle_size=2):
+        """반복되거나 거의 같은 시청자 메시지에 대한 응답 캐시
+
+        메시지를 정규화한 키가 같으면 바로 찾고, 아니면 글자 shingle 역색인으로
+        후보만 골라 자카드 유사도가 similarity 이상인 항목을 찾습니다. 찾은 항목의
+        응답 텍스트와 음성을 그대로 재사용하므로 LLM과 TTS를 다시 호출하지 않습니다.
+
+        짧은 한국어 메시지는 어미 한 글자만 달라도 3글자 shingle이 대부분 달라지므로
+        2글자 shingle을 쓰고, 유사도가 높아도 어미/조사나 앞의 호칭 말고 다른 글자가
+        다르거나 부정 표현 유무가 다르면 비슷한 메시지로 보지 않습니다.
+
+        Args:
+            ttl (float): 항목 유지 시간 (초)
+            similarity (float): 비슷한 메시지로 볼 최소 자카드 유사도
+            max_entries (int): 최대 항목 수 (음성을 메모리에 들고 있으므로 작게 유지, 넘으면 오래 안 쓴 것부터 제거)
+            shingle_size (int): shingle 글자 수
+        """
+        self.ttl = ttl
+        self.similarity = similarity
+        self.max_entries = max_entries
+        self.shingle_size = shingle_size
+        self._entries = OrderedDict()
+        self._index = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.expired = 0
+
+    def get(self, message):
+        """메시지와 같거나 비슷한 메시지의 캐시된 응답 반환
+
+        Returns:
+            CachedResponse: 캐시된 응답 (없으면 None)
+        """
+        key = normalize_message(message)
+        if not key:
+            return None
+        with self._lock:
+            self.lookups += 1
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.exact_hits += 1
+            else:
+                entry = self._find_similar(key)
+                if entry is None:
+                    return None
+                self.fuzzy_hits += 1
+            entry.hits += 1
+            self._entries.move_to_end(entry.key)
+            return entry
+
+    def put(self, message, text, clips=()):
+        """응답 저장
+
+        Args:
+            message (str): 시청자 메시지
+            text (str): 응답 텍스트
+            clips (list): 응답을 합성한 AudioClip 목록 (음소거 중이었으면 비어 있음)
+
+        Returns:
+            CachedResponse: 저장된 항목 (메시지가 비어 있으면 None)
+        """
+        key = normalize_message(message)
+        if not key or not text:
+            return None
+        entry = CachedResponse(key, message, text, clips, shingles(key, self.shingle_size))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for shingle in entry.shingles:
+                self._index.setdefault(shingle, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def _find_similar(self, key):
+        """shingle 역색인으로 후보를 모아 어미/조사만 다른 항목 중 자카드 유사도가 가장 높은 항목 반환"""
+        query_shingles = shingles(key, self.shingle_size)
+        negated = has_negation(key)
+        overlaps = {}
+        for shingle in query_shingles:
+            for candidate in self._index.get(shingle, ()):
+                overlaps[candidate] = overlaps.get(candidate, 0) + 1
+        best, best_score = None, self.similarity
+        for candidate, overlap in overlaps.items():
+            entry = self._entries[candidate]
+            if entry.negated != negated:
+                continue
+            score = overlap / (len(query_shingles) + len(entry.shingles) - overlap)
+            if score >= best_score and only_endings_differ(key, entry.key):
+                best, best_score = entry, score
+        return best
+
+    def _expire(self):
+        now = time.monotonic()
+        stale = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in stale:
+            self._remove(key)
+        self.expired += len(stale)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for shingle in entry.shingles:
+            keys = self._index.get(shingle)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[shingle]
+
+    def stats(self):
+        """조회 수와 적중률 반환"""
+        with self._lock:
+            hits = self.exact_hits + self.fuzzy_hits
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "hit_rate": hits / self.lookups if self.lookups else None,
+                "expired": self.expired,
+                "audio_seconds": sum(clip.duration for entry in self._entries.values() for clip in entry.clips),
+            }
@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity_seconds=60.0, sample_rate=16000):
+        """고정 크기 float32 오디오 링 버퍼 초기화
+
+        시작 시 한 번만 메모리를 할당하고, 이후에는 녹음 콜백이 그 안에 바로
+        씁니다. 위치는 녹음 시작부터 센 절대 샘플 번호로 다루므로 발화 구간을
+        (시작, 끝) 두 숫자로 주고받을 수 있습니다.
+
+        Args:
+            capacity_seconds (float): 보관할 최근 오디오 길이 (초)
+            sample_rate (int): 샘플레이트
+        """
+        self.sample_rate = sample_rate
+        self.capacity = int(capacity_seconds * sample_rate)
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._lock = threading.Lock()
+        self.position = 0
+
+        self.write_count = 0
+        self.view_count = 0
+        self.copy_count = 0
+        self.copied_bytes = 0
+        self.overrun_count = 0
+        self.peak_read_samples = 0
+
+    @property
+    def oldest(self):
+        """아직 덮어쓰이지 않은 가장 오래된 샘플의 절대 위치"""
+        return max(0, self.position - self.capacity)
+
+    def write(self, samples):
+        """샘플을 버퍼 끝에 기록
+
+        Args:
+            samples (np.ndarray): 모노 오디오 (float32로 변환되며 복사는 버퍼 안에서만 일어남)
+
+        Returns:
+            tuple: 기록된 구간의 (시작, 끝) 절대 위치
+        """
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+        with self._lock:
+            start = self.position
+            offset = (start + count - len(samples)) % self.capacity
+            first = min(len(samples), self.capacity - offset)
+            self._data[offset:offset + first] = samples[:first]
+            self._data[:len(samples) - first] = samples[first:]
+            self.position = start + count
+            self.write_count += 1
+        return start, start + count
+
+    def read(self, start, end, copy=True):
+        """절대 위치 구간의 오디오 반환
+
+        구간이 버퍼 안에서 연속이고 copy가 False면 복사 없이 뷰를 반환합니다.
+        뷰는 이후 기록에 덮어쓰일 수 있으므로 다른 스레드로 넘길 때는 copy=True로
+        한 번만 복사해 사용합니다.
+
+        Args:
+            start (int): 시작 절대 위치
+            end (int): 끝 절대 위치
+            copy (bool): 항상 새 배열로 복사할지 여부
+
+        Returns:
+            np.ndarray: float32 오디오
+        """
+        with self._lock:
+            if start < self.oldest:
+                # 읽기 전에 덮어쓰인 부분은 건너뜀
+                self.overrun_count += 1
+                start = self.oldest
+            end = min(end, self.position)
+            length = max(0, end - start)
+            self.peak_read_samples = max(self.peak_read_samples, length)
+
+            offset = start % self.capacity
+            if offset + length <= self.capacity:
+                view = self._data[offset:offset + length]
+                if not copy:
+                    self.view_count += 1
+                    return view
+                self.copy_count += 1
+                self.copied_bytes += view.nbytes
+                return view.copy()
+
+            first = self.capacity - offset
+            audio = np.empty(length, dtype=np.float32)
+            audio[:first] = self._data[offset:]
+            audio[first:] = self._data[:length - first]
+            self.copy_count += 1
+            self.copied_bytes += audio.nbytes
+            return audio
+
+    def stats(self):
+        """할당/복사 통계 반환
+
+        Returns:
+            dict: 버퍼 크기(바이트), 기록 횟수, 뷰/복사 횟수, 복사한 바이트 수,
+                덮어쓰기로 잃은 읽기 횟수, 가장 긴 읽기 구간(초)
+        """
+        with self._lock:
+            return {
+                "buffer_bytes": self._data.nbytes,
+                "writes": self.write_count,
+                "views": self.view_count,
+                "copies": self.copy_count,
+                "copied_bytes": self.copied_bytes,
+                "overruns": self.overrun_count,
+                "peak_read_seconds": self.peak_read_samples / self.sample_rate,
+            }
@@ -0,0 +1,144 @@
+import argparse
+import base64
+import json
+import time
+from pathlib import Path
+
+import torch
+
+from audio_clip import AudioClip
+from latency_metrics import LatencyMetrics
+from rvc_engine import RVCEngine, RVC_PROFILES
+from tts_client import GoogleTTSClient
+
+
+def load_corpus(path, count):
+    """파인튜닝 데이터의 답변 문장을 고정 말뭉치로 사용"""
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                texts.append(json.loads(line)["output"])
+            except (json.JSONDecodeError, KeyError):
+                continue
+            if len(texts) >= count:
+                break
+    return texts
+
+
+def synthesize_base_audio(api_key, texts):
+    """Google TTS로 RVC 입력용 기본 음성 생성 (모든 문장 동시 요청)"""
+    client = GoogleTTSClient(api_key)
+    futures = []
+    for text in texts:
+        futures.append(client.submit({
+            "input": {"text": text},
+            "voice": {"languageCode": "ko-KR", "name": "ko-KR-Chirp3-HD-Leda"},
+            "audioConfig": {"audioEncoding": "LINEAR16", "speakingRate": 1.0}
+        }))
+
+    clips = []
+    for text, future in zip(texts, futures):
+        response = future.result()
+        if response.status_code != 200:
+            print(f"TTS API 오류로 제외: {text[:20]}... ({response.status_code})")
+            continue
+        clips.append(AudioClip.from_wav_bytes(base64.b64decode(response.json()["audioContent"])))
+    client.close()
+    return clips
+
+
+def load_wav_dir(path):
+    """디렉토리의 WAV 파일을 기본 음성으로 사용"""
+    return [AudioClip.from_file(str(wav)) for wav in sorted(Path(path).glob("*.wav"))]
+
+
+def run_benchmark(engine, clips, profiles, repeats=1):
+    """프로필별로 말뭉치 전체를 변환하며 실시간 배율 측정
+
+    Returns:
+        dict: 프로필별 {"audio_seconds", "total_seconds", "rtf", "rtf_p95"}
+    """
+    metrics = LatencyMetrics()
+    results = {}
+    for profile in profiles:
+        print(f"[{profile}] 워밍업 중...")
+        engine.convert(clips[0].samples, clips[0].sample_rate, profile=profile)
+
+        audio_seconds = 0.0
+        total_seconds = 0.0
+        for _ in range(repeats):
+            for clip in clips:
+                start_time = time.perf_counter()
+                engine.convert(clip.samples, clip.sample_rate, profile=profile)
+                elapsed = time.perf_counter() - start_time
+                metrics.record(profile, elapsed, clip.duration)
+                audio_seconds += clip.duration
+                total_seconds += elapsed
+
+        stats = metrics.snapshot()["stages"][profile]
+        results[profile] = {
+            "audio_seconds": audio_seconds,
+            "total_seconds": total_seconds,
+            "rtf": total_seconds / audio_seconds,
+            "rtf_p95": stats["rtf_p95"],
+        }
+        print(f"[{profile}] 오디오 {audio_seconds:.1f}초 / 변환 {total_seconds:.1f}초 "
+              f"(RTF {results[profile]['rtf']:.3f}, p95 {stats['rtf_p95']:.3f})")
+    return results
+
+
+def recommend_profile(results, max_rtf):
+    """p95 실시간 배율이 max_rtf 이하인 프로필 중 가장 품질이 높은 것 선택"""
+    for profile in reversed(list(RVC_PROFILES)):
+        if profile in results and results[profile]["rtf_p95"] <= max_rtf:
+            return profile
+    return min(results, key=lambda name: results[name]["rtf_p95"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RVC 품질/속도 프로필 벤치마크")
+    parser.add_argument("--api-key", help="기본 음성을 만들 Google TTS API 키")
+    parser.add_argument("--wav-dir", help="기본 음성으로 사용할 WAV 디렉토리 (API 키 대신)")
+    parser.add_argument("--corpus", default="hana_finetune.jsonl", help="문장 말뭉치 (jsonl)")
+    parser.add_argument("--count", type=int, default=10, help="사용할 문장 수")
+    parser.add_argument("--repeats", type=int, default=1, help="말뭉치 반복 횟수")
+    parser.add_argument("--profiles", nargs="+", default=list(RVC_PROFILES), choices=list(RVC_PROFILES))
+    parser.add_argument("--model", default="logs/Arcueid Brunestud/model.pth")
+    parser.add_argument("--index", default="logs/Arcueid Brunestud/model.index")
+    parser.add_argument("--device", default="cuda:0" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--max-rtf", type=float, default=0.5,
+                        help="추천 기준 p95 실시간 배율 (스트리밍 재생이 끊기지 않으려면 1보다 충분히 작아야 함)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    if args.wav_dir:
+        clips = load_wav_dir(args.wav_dir)
+    elif args.api_key:
+        clips = synthesize_base_audio(args.api_key, load_corpus(args.corpus, args.count))
+    else:
+        parser.error("--api-key 또는 --wav-dir 중 하나가 필요합니다.")
+    if not clips:
+        parser.error("벤치마크할 음성이 없습니다.")
+    print(f"말뭉치: {len(clips)}개, 총 {sum(clip.duration for clip in clips):.1f}초, 장치: {args.device}")
+
+    engine = RVCEngine(args.model, args.index, device=args.device, warmup=False)
+    results = run_benchmark(engine, clips, args.profiles, repeats=args.repeats)
+
+    recommended = recommend_profile(results, args.max_rtf)
+    print(f"\n{'프로필':<14}{'RTF':>8}{'RTF p95':>10}")
+    for profile, result in results.items():
+        print(f"{profile:<14}{result['rtf']:>8.3f}{result['rtf_p95']:>10.3f}")
+    print(f"\n이 장비에 추천하는 프로필: {recommended} (GoogleTTS(rvc_profile=\"{recommended}\"))")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"device": args.device, "results": results, "recommended": recommended},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
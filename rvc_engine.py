@@ -0,0 +1,239 @@
+import sys
+import time
+import threading
+
+import numpy as np
+import torch
+
+sys.path.append("E:/hana/ApplioV3.2.8-bugfix")
+from rvc.infer.infer import VoiceConverter
+from rvc.infer import pipeline as rvc_pipeline
+
+from audio_clip import resample
+
+RVC_SAMPLE_RATE = 16000  # RVC 입력(임베더) 샘플레이트
+
+# 품질/속도 프로필
+# - low-latency: 가벼운 fcpe 피치 추출, 인덱스 검색 생략 (CPU용)
+# - balanced: rmvpe 피치 추출, 인덱스 비중과 필터를 줄여 속도 확보
+# - quality: 기존 고정 설정 (rmvpe, 인덱스 0.75, 중간값 필터 3)
+RVC_PROFILES = {
+    "low-latency": {"f0_method": "fcpe", "hop_length": 160, "index_rate": 0.0, "filter_radius": 0,
+                    "protect": 0.5, "volume_envelope": 1.0},
+    "balanced": {"f0_method": "rmvpe", "hop_length": 128, "index_rate": 0.5, "filter_radius": 0,
+                 "protect": 0.5, "volume_envelope": 1.0},
+    "quality": {"f0_method": "rmvpe", "hop_length": 128, "index_rate": 0.75, "filter_radius": 3,
+                "protect": 0.5, "volume_envelope": 1.0},
+}
+
+
+class _ResidentIndex:
+    """faiss 인덱스 래퍼: reconstruct_n 결과를 한 번만 계산해 재사용"""
+
+    def __init__(self, index):
+        self._index = index
+        self._vectors = {}
+
+    def reconstruct_n(self, start, count):
+        key = (start, count)
+        if key not in self._vectors:
+            self._vectors[key] = self._index.reconstruct_n(start, count)
+        return self._vectors[key]
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+class _ResidentFaiss:
+    """faiss 모듈 대리 객체: 같은 경로의 인덱스를 다시 읽지 않음"""
+
+    def __init__(self, faiss_module):
+        self._faiss = faiss_module
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def read_index(self, path, *args):
+        with self._lock:
+            if path not in self._indexes:
+                self._indexes[path] = _ResidentIndex(self._faiss.read_index(path, *args))
+            return self._indexes[path]
+
+    def __getattr__(self, name):
+        return getattr(self._faiss, name)
+
+
+class RVCEngine:
+    def __init__(self, model_path, index_path, embedder_model="contentvec", device=None, warmup=True,
+                 profile="quality"):
+        """상주형 RVC 음성 변환 엔진 초기화
+
+        모델, 인덱스, 임베더를 한 번만 로드해 두고 NumPy 배열 단위로 변환합니다.
+
+        Args:
+            model_path (str): RVC 모델(.pth) 경로
+            index_path (str): RVC 인덱스(.index) 경로
+            embedder_model (str): 임베더 모델 이름
+            device (str, optional): 사용할 장치 (None이면 자동 선택)
+            warmup (bool): 초기화 시 워밍업 변환 수행 여부
+            profile (str): 기본 품질/속도 프로필 (RVC_PROFILES의 키)
+        """
+        self.set_profile(profile)
+        self.model_path = model_path
+        self.index_path = index_path
+        self.embedder_model = embedder_model
+        self._lock = threading.Lock()
+
+        self.vc = VoiceConverter()
+        self.config = self.vc.config
+        if device is None:
+            device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        self.config.device = device
+        self.config.is_half = device.startswith("cuda")
+
+        start_time = time.time()
+        print("RVC 모델 로딩 중...")
+        self.vc.get_vc(model_path, 0)
+        self.vc.load_hubert(embedder_model)
+        self.vc.last_embedder_model = embedder_model
+
+        # 파이프라인이 매 호출마다 인덱스를 다시 읽지 않도록 메모리에 상주시킴
+        if not isinstance(rvc_pipeline.faiss, _ResidentFaiss):
+            rvc_pipeline.faiss = _ResidentFaiss(rvc_pipeline.faiss)
+        try:
+            index = rvc_pipeline.faiss.read_index(index_path)
+            index.reconstruct_n(0, index.ntotal)
+        except Exception as e:
+            print(f"RVC 인덱스 로드 실패 (인덱스 없이 변환): {e}")
+            self.index_path = ""
+        print(f"RVC 모델 로딩 완료 ({time.time() - start_time:.2f}초, 장치: {device})")
+
+        if warmup:
+            self.warmup()
+
+    def set_profile(self, profile):
+        """기본 품질/속도 프로필 변경
+
+        Args:
+            profile (str): RVC_PROFILES의 키
+        """
+        if profile not in RVC_PROFILES:
+            raise ValueError(f"알 수 없는 RVC 프로필: {profile} (사용 가능: {', '.join(RVC_PROFILES)})")
+        self.profile = profile
+
+    @property
+    def sample_rate(self):
+        """변환 결과 샘플레이트"""
+        return self.vc.tgt_sr
+
+    def warmup(self):
+        """첫 변환의 초기화 비용을 미리 치르기 위한 더미 변환"""
+        start_time = time.time()
+        t = np.arange(RVC_SAMPLE_RATE, dtype=np.float32) / RVC_SAMPLE_RATE
+        dummy = 0.1 * np.sin(2 * np.pi * 220.0 * t).astype(np.float32)
+        try:
+            self.convert(dummy, RVC_SAMPLE_RATE)
+            print(f"RVC 워밍업 완료 ({time.time() - start_time:.2f}초)")
+        except Exception as e:
+            print(f"RVC 워밍업 실패: {e}")
+
+    def _prepare(self, audio, sample_rate):
+        """입력 오디오를 RVC 입력 형식(16kHz, 정규화)으로 변환"""
+        audio = resample(np.asarray(audio, dtype=np.float32), sample_rate, RVC_SAMPLE_RATE)
+        audio_max = np.abs(audio).max() / 0.95 if len(audio) else 0
+        if audio_max > 1:
+            audio = audio / audio_max
+        return audio
+
+    def _run_pipeline(self, audio, pitch, profile):
+        params = RVC_PROFILES[profile or self.profile]
+        with self._lock:
+            audio_opt = self.vc.vc.pipeline(
+                model=self.vc.hubert_model,
+                net_g=self.vc.net_g,
+                sid=0,
+                audio=audio,
+                pitch=pitch,
+                f0_method=params["f0_method"],
+                file_index=self.index_path,
+                index_rate=params["index_rate"] if self.index_path else 0,
+                pitch_guidance=self.vc.use_f0,
+                filter_radius=params["filter_radius"],
+                volume_envelope=params["volume_envelope"],
+                version=self.vc.version,
+                protect=params["protect"],
+                hop_length=params["hop_length"],
+                f0_autotune=False,
+                f0_autotune_strength=1,
+                f0_file=None,
+            )
+
+        if audio_opt.dtype == np.int16:
+            audio_opt = audio_opt.astype(np.float32) / 32768.0
+        return audio_opt.astype(np.float32, copy=False)
+
+    def convert(self, audio, sample_rate, pitch=0, profile=None):
+        """오디오 배열을 RVC로 변환
+
+        Args:
+            audio (np.ndarray): float32 모노 오디오 (-1.0 ~ 1.0)
+            sample_rate (int): 입력 샘플레이트
+            pitch (int): 피치 조절 (반음 단위)
+            profile (str, optional): 이번 변환에만 쓸 프로필 (None이면 기본 프로필)
+
+        Returns:
+            tuple: (변환된 float32 오디오, 출력 샘플레이트)
+        """
+        audio = self._prepare(audio, sample_rate)
+        converted = self._run_pipeline(audio, pitch, profile)
+        return converted, self.sample_rate
+
+    def convert_stream(self, audio, sample_rate, pitch=0, window_seconds=4.0, overlap_seconds=0.25,
+                       profile=None):
+        """긴 오디오를 겹치는 구간으로 나눠 변환하면서 순서대로 내보냄
+
+        각 구간은 overlap_seconds만큼 겹치게 변환한 뒤 겹친 부분을 선형(등이득)
+        크로스페이드로 이어 붙입니다. 두 구간은 같은 입력을 변환해 겹친 부분이
+        거의 같으므로 등전력 크로스페이드를 쓰면 그 부분이 최대 3dB 커집니다.
+        한 번에 변환하는 길이가 window_seconds로 제한되므로 메모리 사용량이
+        발화 길이와 무관하고, 첫 구간이 끝나는 즉시 재생을 시작할 수 있습니다.
+
+        Args:
+            audio (np.ndarray): float32 모노 오디오 (-1.0 ~ 1.0)
+            sample_rate (int): 입력 샘플레이트
+            pitch (int): 피치 조절 (반음 단위)
+            window_seconds (float): 한 번에 변환할 구간 길이 (초)
+            overlap_seconds (float): 이웃 구간과 겹치는 길이 (초)
+            profile (str, optional): 이번 변환에만 쓸 프로필 (None이면 기본 프로필)
+
+        Yields:
+            np.ndarray: 출력 샘플레이트의 변환된 float32 오디오 조각
+        """
+        audio = self._prepare(audio, sample_rate)
+        window = int(window_seconds * RVC_SAMPLE_RATE)
+        overlap = int(overlap_seconds * RVC_SAMPLE_RATE)
+        step = window - overlap
+        ratio = self.sample_rate / RVC_SAMPLE_RATE
+
+        tail = None
+        start = 0
+        while start < len(audio):
+            # 남은 길이가 짧으면 따로 변환하지 않고 마지막 구간에 붙여서 처리
+            is_last = len(audio) - start <= window + window // 2
+            end = len(audio) if is_last else start + window
+            converted = self._run_pipeline(audio[start:end], pitch, profile)
+
+            if tail is not None:
+                fade_len = min(len(tail), len(converted))
+                fade = np.linspace(0.0, 1.0, fade_len, dtype=np.float32)
+                head = converted[:fade_len] * fade + tail[:fade_len] * (1.0 - fade)
+                converted = np.concatenate([head, converted[fade_len:]])
+
+            if is_last:
+                yield converted
+                break
+
+            # 다음 구간과 겹칠 끝부분은 남겨 두었다가 크로스페이드에 사용
+            tail_len = min(int(round(overlap * ratio)), len(converted))
+            tail = converted[len(converted) - tail_len:]
+            yield converted[:len(converted) - tail_len]
+            start += step
@@ -0,0 +1,131 @@
+import re
+
+# 문장 끝 문장부호 (뒤따르는 닫는 따옴표/괄호 포함)
+_SENTENCE_END = re.compile(r'[.!?。…]+["\'”’)\]]*(?=\s|$)|\n+')
+
+# 긴 문장을 나눌 수 있는 절 경계 (쉼표, 연결 어미 뒤 공백)
+_CLAUSE_BREAK = re.compile(r'(?<=,)\s+|(?<=[고며서데만면])\s+(?=\S{2,})')
+
+
+def _split_clauses(sentence, max_chars):
+    """너무 긴 문장을 절 단위로 나눔"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    pieces = []
+    current = ""
+    for part in _CLAUSE_BREAK.split(sentence):
+        part = part.strip()
+        if not part:
+            continue
+        candidate = f"{current} {part}" if current else part
+        if current and len(candidate) > max_chars:
+            pieces.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(text, max_chars=80, min_chars=8):
+    """한국어 텍스트를 음성 합성용 문장/절 단위로 분할
+
+    Args:
+        text (str): 분할할 텍스트
+        max_chars (int): 한 조각의 최대 길이 (넘으면 절 단위로 다시 나눔)
+        min_chars (int): 이보다 짧은 조각은 다음 조각과 합침 (끊어지는 억양 방지)
+
+    Returns:
+        list: 분할된 문장 목록
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    chunks = []
+    for sentence in sentences:
+        chunks.extend(_split_clauses(sentence, max_chars))
+
+    merged = []
+    pending = ""
+    for chunk in chunks:
+        pending = f"{pending} {chunk}" if pending else chunk
+        if len(pending) >= min_chars:
+            merged.append(pending)
+            pending = ""
+    if pending:
+        if merged:
+            merged[-1] = f"{merged[-1]} {pending}"
+        else:
+            merged.append(pending)
+    return merged
+
+
+class SentenceStreamer:
+    def __init__(self, max_chars=80, min_chars=8):
+        """조금씩 도착하는 텍스트를 완성된 문장 단위로 내보내는 분할기
+
+        LLM 스트리밍 응답처럼 텍스트가 나뉘어 들어올 때, 문장이 끝났음이
+        확실해지는 즉시(문장부호 뒤에 공백이나 줄바꿈이 온 시점) 그 문장을
+        돌려줍니다. 나뉘는 기준은 split_sentences와 같습니다.
+
+        Args:
+            max_chars (int): 한 조각의 최대 길이 (문장이 끝나지 않아도 절 단위로 먼저 내보냄)
+            min_chars (int): 이보다 짧은 조각은 다음 문장과 합쳐서 내보냄
+        """
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        """텍스트 조각을 추가하고 완성된 문장 목록 반환"""
+        self.buffer += text
+
+        # 끝에 붙은 문장부호는 다음 조각에서 더 이어질 수 있으므로 뒤에 글자가 온 경계까지만 사용
+        complete_end = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            if match.end() < len(self.buffer):
+                complete_end = match.end()
+
+        if complete_end and len(self.buffer[:complete_end].strip()) >= self.min_chars:
+            complete, self.buffer = self.buffer[:complete_end], self.buffer[complete_end:]
+            return split_sentences(complete, self.max_chars, self.min_chars)
+
+        # 문장이 끝나지 않은 채 너무 길어지면 마지막 절만 남기고 먼저 내보냄
+        if len(self.buffer) > self.max_chars * 2:
+            pieces = _split_clauses(self.buffer.strip(), self.max_chars)
+            if len(pieces) > 1:
+                self.buffer = pieces[-1]
+                return pieces[:-1]
+        return []
+
+    def flush(self):
+        """남은 텍스트를 모두 문장 목록으로 반환"""
+        remaining, self.buffer = self.buffer, ""
+        return split_sentences(remaining, self.max_chars, self.min_chars) if remaining.strip() else []
+
+
+def stream_sentences(chunks, max_chars=80, min_chars=8):
+    """텍스트 조각 이터러블에서 완성된 문장을 차례로 생성
+
+    Args:
+        chunks (iterable): 텍스트 조각
+        max_chars (int): 한 조각의 최대 길이
+        min_chars (int): 이보다 짧은 조각은 다음 조각과 합침
+
+    Yields:
+        str: 완성된 문장
+    """
+    streamer = SentenceStreamer(max_chars, min_chars)
+    for chunk in chunks:
+        yield from streamer.feed(chunk)
+    yield from streamer.flush()
@@ -1,26 +1,35 @@
 import os
-import requests
 import json
-import wave
-import pyaudio
 import base64
 from pathlib import Path
-import sys
+import time
+import queue
+import threading
+import numpy as np
 import torch  # torch 임포트 추가
 from fairseq.checkpoint_utils import load_model_ensemble_and_task_from_hf_hub
 
-sys.path.append("E:/hana/ApplioV3.2.8-bugfix")
-from rvc.infer.infer import VoiceConverter
-from rvc.configs.config import Config
+from audio_clip import AudioClip
+from audio_player import AudioPlayer
+from circuit_breaker import CircuitBreaker
+from fallback_tts import LocalFallbackTTS
+from latency_metrics import LatencyMetrics
+from rvc_engine import RVCEngine
+from tts_cache import TTSCache
+from tts_client import GoogleTTSClient
+from sentence_splitter import split_sentences
 
 class GoogleTTS:
-    def __init__(self, api_key, temp_dir="temp", rvc_model_path="logs/Arcueid Brunestud/model.pth", rvc_index_path="logs/Arcueid Brunestud/model.index"):
+    def __init__(self, api_key, temp_dir="temp", rvc_model_path="logs/Arcueid Brunestud/model.pth", rvc_index_path="logs/Arcueid Brunestud/model.index", cache_dir="tts_cache", debug=False, hedge_after=None, rvc_profile="quality"):
         self.api_key = api_key
         self.temp_dir = temp_dir
         self.default_language = "ko-KR"
         self.default_voice = "ko-KR-Chirp3-HD-Leda"
-        
-        os.makedirs(temp_dir, exist_ok=True)
+        # 디버그 모드에서만 중간 결과를 temp_dir에 파일로 남김
+        self.debug = debug
+
+        if debug:
+            os.makedirs(temp_dir, exist_ok=True)
         
         self.emotion_params = {
             "happy": {"rate": 1.0, "volume": 0},
@@ -31,16 +40,36 @@ class GoogleTTS:
             "calm": {"rate": 1.0, "volume": 0}
         }
 
+        # 단계별 지연 시간 / 실시간 배율 / 대체 경로 사용 횟수 수집
+        self.metrics = LatencyMetrics()
+
         self.rvc_model_path = rvc_model_path
         self.rvc_index_path = rvc_index_path
-        self.vc = VoiceConverter()
-        self.config = Config()
-        if torch.cuda.is_available():
-            self.config.device = "cuda:0"
-            self.config.is_half = True
-        else:
-            self.config.device = "cpu"
-            self.config.is_half = False
+        # 모델, 인덱스, 임베더를 한 번만 로드해 두고 매 발화마다 재사용
+        # rvc_profile: "low-latency" / "balanced" / "quality" (rvc_benchmark.py로 장비별 선택)
+        self.rvc = RVCEngine(rvc_model_path, rvc_index_path,
+                             device="cuda:0" if torch.cuda.is_available() else "cpu",
+                             profile=rvc_profile)
+
+        # 같은 문장은 다시 합성하지 않도록 디스크 캐시 사용 (None이면 비활성화)
+        self.cache = TTSCache(cache_dir) if cache_dir else None
+
+        # 연결을 재사용하고 제한 시간을 두는 TTS 클라이언트 (문장 단위 동시 요청)
+        self.client = GoogleTTSClient(api_key, hedge_after=hedge_after, metrics=self.metrics)
+
+        # Google TTS가 연속으로 실패하면 일정 시간 동안 바로 로컬 대체 엔진 사용
+        self.breaker = CircuitBreaker(failure_threshold=3, cooldown=60.0, name="Google TTS")
+        self.fallback = LocalFallbackTTS()
+
+        # 이보다 긴 음성은 RVC를 구간 단위로 변환하면서 바로 재생 (초)
+        self.rvc_stream_threshold = 6.0
+
+        # 출력 장치를 한 번만 열어 두고 전용 스레드에서 재생
+        self.player = AudioPlayer(metrics=self.metrics)
+
+        # 진행 중인 speak_sentences 호출별 중단 신호 (stop_speaking에서 모두 설정)
+        self._active_speeches = set()
+        self._speech_lock = threading.Lock()
 
     def _get_speaking_rate(self, emotion):
         if emotion in self.emotion_params:
@@ -52,124 +81,364 @@ class GoogleTTS:
             return self.emotion_params[emotion]["volume"]
         return 0
 
-    def synthesize_with_emotion(self, text, emotion="neutral", speed=1.0, temperature=None):
+    def _get_pitch_shift(self, emotion):
+        if emotion == "happy" or emotion == "excited":
+            return 2
+        elif emotion == "sad" or emotion == "calm":
+            return -2
+        elif emotion == "angry":
+            return 1
+        return 0
+
+    def _make_cache_key(self, text, emotion, speaking_rate, volume):
+        return TTSCache.make_key(
+            text=text,
+            language=self.default_language,
+            voice=self.default_voice,
+            emotion=emotion,
+            speaking_rate=speaking_rate,
+            volume=volume,
+            rvc_model=self.rvc_model_path,
+            rvc_index=self.rvc_index_path,
+            rvc_profile=self.rvc.profile,
+            pitch=self._get_pitch_shift(emotion)
+        )
+
+    def _start_synthesis(self, text, emotion="neutral", speed=1.0):
+        """캐시를 확인하고, 없으면 TTS 요청을 백그라운드로 시작
+
+        Returns:
+            tuple: (캐시 키, 바로 쓸 수 있는 음성 또는 None, 응답 Future 또는 None)
+        """
+        speaking_rate = self._get_speaking_rate(emotion) if speed == 1.0 else speed
+        volume = self._get_volume(emotion)
+
+        cache_key = None
+        if self.cache:
+            cache_key = self._make_cache_key(text, emotion, speaking_rate, volume)
+            with self.metrics.measure("cache_lookup"):
+                cached_clip = self.cache.get(cache_key)
+            if cached_clip:
+                print(f"캐시된 음성 사용 (적중률: {self.cache.hit_rate:.0%})")
+                return cache_key, cached_clip, None
+
+        if not self.breaker.allow_request():
+            self.metrics.increment("breaker_open_skip")
+            return cache_key, self._use_fallback_tts(text, emotion), None
+
+        print(f"감정({emotion})을 담아 음성 생성 중...")
+        request_data = {
+            "input": {"text": text},
+            "voice": {"languageCode": self.default_language, "name": self.default_voice},
+            "audioConfig": {"audioEncoding": "LINEAR16", "speakingRate": speaking_rate, "volumeGainDb": volume}
+        }
+        return cache_key, None, self.client.submit(request_data)
+
+    def _finish_synthesis(self, text, emotion, cache_key, future, on_chunk=None):
+        """TTS 응답을 받아 RVC 변환 후 캐시에 저장
+
+        on_chunk가 주어지고 음성이 rvc_stream_threshold보다 길면 구간 단위로
+        변환하면서 변환된 조각을 바로 on_chunk로 넘깁니다.
+        """
         try:
-            print(f"감정({emotion})을 담아 음성 생성 중...")
-            speaking_rate = self._get_speaking_rate(emotion) if speed == 1.0 else speed
-            volume = self._get_volume(emotion)
-            url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={self.api_key}"
-            request_data = {
-                "input": {"text": text},
-                "voice": {"languageCode": self.default_language, "name": self.default_voice},
-                "audioConfig": {"audioEncoding": "LINEAR16", "speakingRate": speaking_rate, "volumeGainDb": volume}
-            }
-            response = requests.post(url, json=request_data)
+            with self.metrics.measure("tts_wait"):
+                response = future.result()
             if response.status_code != 200:
-                print(f"TTS API 오류: {response.status_code}, {response.text}")
-                return self._use_fallback_tts(text)
-            
-            audio_content = response.json().get("audioContent")
-            if not audio_content:
-                print("오디오 콘텐츠를 받지 못했습니다.")
-                return self._use_fallback_tts(text)
-
-            base_output_path = os.path.join(self.temp_dir, "base_output.wav")
-            with open(base_output_path, "wb") as f:
-                f.write(base64.b64decode(audio_content))
-
-            # 샘플레이트 확인
-            with wave.open(base_output_path, 'rb') as wf:
-                base_sample_rate = wf.getframerate()
-                print(f"base_output.wav 샘플레이트: {base_sample_rate} Hz")
-
-            final_output_path = os.path.join(self.temp_dir, "output.wav")
+                raise RuntimeError(f"TTS API 오류: {response.status_code}, {response.text}")
+            with self.metrics.measure("decode") as timing:
+                audio_content = response.json().get("audioContent")
+                if not audio_content:
+                    raise RuntimeError("오디오 콘텐츠를 받지 못했습니다.")
+                base_clip = AudioClip.from_wav_bytes(base64.b64decode(audio_content))
+                timing["audio_seconds"] = base_clip.duration
+        except Exception as e:
+            print(f"감정 음성 합성 중 오류 발생: {str(e)}")
+            self.metrics.increment("tts_error")
+            self.breaker.record_failure()
+            return self._use_fallback_tts(text, emotion)
+        self.breaker.record_success()
+
+        print(f"기본 음성 샘플레이트: {base_clip.sample_rate} Hz")
+        self._save_debug(base_clip, "base_output")
+
+        emitted = []
+
+        def emit(piece):
+            emitted.append(piece)
+            on_chunk(piece)
+
+        try:
             print(f"{emotion} 감정으로 RVC 변환 중...")
-            self._apply_rvc(base_output_path, final_output_path, emotion)
+            if on_chunk is not None and base_clip.duration > self.rvc_stream_threshold:
+                final_clip = self._apply_rvc_streaming(base_clip, emotion, emit)
+            else:
+                final_clip = self._apply_rvc(base_clip, emotion)
+        except Exception as e:
+            print(f"RVC 변환 중 오류 발생: {str(e)}")
+            self.metrics.increment("rvc_error")
+            if emitted:
+                # 이미 일부 조각을 내보냈으므로 나머지는 건너뜀
+                return None
+            return base_clip
 
-            if not os.path.exists(final_output_path) or os.path.getsize(final_output_path) < 100:
-                print("RVC 변환 후 파일 문제 발생.")
-                return base_output_path
+        if len(final_clip) == 0:
+            print("RVC 변환 결과가 비어 있습니다.")
+            return base_clip
+        self._save_debug(final_clip, "output")
 
-            try:
-                with wave.open(final_output_path, 'rb') as wave_file:
-                    _ = wave_file.getframerate()
-                print("WAV 파일 검증 완료")
-            except Exception as e:
-                print(f"WAV 파일 검증 실패: {str(e)}")
-                return base_output_path
+        if cache_key:
+            self.cache.put(cache_key, final_clip)
 
-            return final_output_path
+        return final_clip
 
+    def synthesize_with_emotion(self, text, emotion="neutral", speed=1.0, temperature=None):
+        try:
+            cache_key, ready_clip, future = self._start_synthesis(text, emotion, speed)
         except Exception as e:
             print(f"감정 음성 합성 중 오류 발생: {str(e)}")
-            return self._use_fallback_tts(text)
+            return self._use_fallback_tts(text, emotion)
+        if ready_clip or future is None:
+            return ready_clip
+        return self._finish_synthesis(text, emotion, cache_key, future)
 
-    def _apply_rvc(self, input_path, output_path, emotion):
-        f0_up_key = 0
-        if emotion == "happy" or emotion == "excited":
-            f0_up_key = 2
-        elif emotion == "sad" or emotion == "calm":
-            f0_up_key = -2
-        elif emotion == "angry":
-            f0_up_key = 1
-
-        self.vc.convert_audio(
-            audio_input_path=input_path,
-            audio_output_path=output_path,
-            model_path=self.rvc_model_path,
-            index_path=self.rvc_index_path,
-            pitch=f0_up_key,
-            f0_method="rmvpe",
-            index_rate=0.75,
-            volume_envelope=1.0,
-            protect=0.5,
-            hop_length=128,
-            split_audio=False,
-            f0_autotune=False,
-            filter_radius=3,
-            embedder_model="contentvec",
-            embedder_model_custom=None,
-            clean_audio=False,
-            export_format="WAV",
-            post_process=False,
-            resample_sr=0,
-            sid=0
-        )
+    def _save_debug(self, clip, name):
+        if not self.debug:
+            return
+        # 동시에 합성해도 서로 덮어쓰지 않도록 시각을 붙인 파일명 사용
+        path = os.path.join(self.temp_dir, f"{name}_{int(time.time() * 1000)}.wav")
+        clip.save(path)
+        print(f"디버그 음성 저장: {path}")
+
+    def _apply_rvc(self, clip, emotion):
+        with self.metrics.measure("rvc", audio_seconds=clip.duration):
+            converted, output_rate = self.rvc.convert(clip.samples, clip.sample_rate, pitch=self._get_pitch_shift(emotion))
+        return AudioClip(converted, output_rate)
 
-    def _use_fallback_tts(self, text):
+    def _apply_rvc_streaming(self, clip, emotion, on_chunk):
+        pieces = []
+        start_time = time.perf_counter()
+        for converted in self.rvc.convert_stream(clip.samples, clip.sample_rate, pitch=self._get_pitch_shift(emotion)):
+            piece = AudioClip(converted, self.rvc.sample_rate)
+            if not pieces:
+                self.metrics.record("rvc_stream_first_chunk", time.perf_counter() - start_time)
+            on_chunk(piece)
+            pieces.append(converted)
+        self.metrics.record("rvc_stream", time.perf_counter() - start_time, clip.duration)
+        # 캐시 저장용으로만 전체를 합침 (재생은 이미 조각 단위로 시작됨)
+        return AudioClip(np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32), self.rvc.sample_rate)
+
+    def _use_fallback_tts(self, text, emotion="neutral"):
+        print("대체 TTS 엔진(로컬) 사용 중...")
+        self.metrics.increment("fallback")
+        with self.metrics.measure("fallback_tts") as timing:
+            clip = self.fallback.synthesize(text)
+            timing["audio_seconds"] = clip.duration if clip else None
+        if not clip:
+            return None
+        # 목소리가 갑자기 바뀌지 않도록 가능하면 RVC도 적용
         try:
-            from gtts import gTTS
-            from pydub import AudioSegment
-            print("대체 TTS 엔진(gTTS) 사용 중...")
-            output_path = os.path.join(self.temp_dir, "output.wav")
-            temp_mp3 = os.path.join(self.temp_dir, "temp.mp3")
-            tts = gTTS(text=text, lang='ko')
-            tts.save(temp_mp3)
-            sound = AudioSegment.from_mp3(temp_mp3)
-            sound.export(output_path, format="wav")
-            return output_path
+            converted = self._apply_rvc(clip, emotion)
+            if len(converted) > 0:
+                return converted
         except Exception as e:
-            print(f"대체 TTS 사용 중 오류 발생: {str(e)}")
-            return None
+            print(f"대체 음성 RVC 변환 실패: {str(e)}")
+        return clip
+
+    def speak_streaming(self, text, emotion="neutral", speed=1.0, wait=True):
+        """문장 단위로 합성하면서 바로 재생
+
+        모든 문장의 TTS 요청을 동시에 보내 두고, 변환된 문장을 곧바로 재생 큐에
+        넣으므로 첫 문장이 재생되는 동안 다음 문장들이 변환되고 재생 엔진이
+        끊김 없이 이어서 출력합니다.
+
+        Args:
+            text (str): 말할 텍스트
+            emotion (str): 감정
+            speed (float): 말하기 속도
+            wait (bool): 재생이 끝날 때까지 대기할지 여부 (False면 합성만 마치고 반환)
+
+        Returns:
+            list: 응답 전체를 다시 재생할 수 있는 AudioClip 목록 (빠진 문장이 있으면 빈 목록)
+        """
+        return self.speak_sentences(split_sentences(text), emotion=emotion, speed=speed, wait=wait)
+
+    def speak_sentences(self, sentences, emotion="neutral", speed=1.0, wait=True):
+        """문장 이터러블을 받는 대로 합성하면서 순서대로 재생
+
+        LLM 스트리밍 응답처럼 문장이 시간차를 두고 도착해도, 각 문장의 TTS 요청은
+        도착 즉시 보내고 변환/재생은 문장 순서대로 진행합니다. 문장 이터러블을 읽다가
+        난 오류는 이미 받은 문장을 합성한 뒤 호출한 쪽으로 다시 발생시킵니다.
+
+        Args:
+            sentences (iterable): 말할 문장 (생성기 가능)
+            emotion (str): 감정
+            speed (float): 말하기 속도
+            wait (bool): 재생이 끝날 때까지 대기할지 여부 (False면 합성만 마치고 반환)
+
+        Returns:
+            list: 응답 전체를 다시 재생할 수 있는 AudioClip 목록 (재생 순서대로, 중단되었거나
+                음성을 만들지 못한 문장이 있으면 빈 목록)
+        """
+        start_time = time.perf_counter()
+        played = []
+        complete = True
+        cancelled = threading.Event()
+        with self._speech_lock:
+            self._active_speeches.add(cancelled)
+
+        def enqueue(clip):
+            # stop_speaking 이후에 변환이 끝난 음성은 재생하지 않음 (확인과 큐 추가를 한 번에)
+            with self._speech_lock:
+                if cancelled.is_set():
+                    return
+                self.player.enqueue(clip)
+            if not played:
+                self.metrics.record("time_to_first_audio", time.perf_counter() - start_time)
+            played.append(clip)
+
+        # 문장이 도착하는 대로 TTS 요청을 보내는 스레드와, 문장 순서대로 변환/재생하는 현재 스레드로 나눔
+        pending = queue.Queue()
+        source_errors = []
+
+        def submit_all():
+            try:
+                for chunk in sentences:
+                    if cancelled.is_set():
+                        # 중단된 뒤에도 응답 텍스트는 끝까지 받도록 문장은 계속 소비하되 합성은 하지 않음
+                        continue
+                    try:
+                        pending.put((chunk,) + self._start_synthesis(chunk, emotion, speed))
+                    except Exception as e:
+                        print(f"문장 합성 요청 중 오류 발생: {str(e)}")
+                        pending.put((chunk, None, self._use_fallback_tts(chunk, emotion), None))
+            except Exception as e:
+                # 문장 생성기 자체의 오류(LLM 스트림 끊김 등)는 호출한 쪽에서 처리하도록 넘김
+                source_errors.append(e)
+            finally:
+                pending.put(None)
+
+        threading.Thread(target=submit_all, daemon=True).start()
 
-    def play_audio(self, file_path):
         try:
-            if not os.path.exists(file_path):
-                print(f"파일을 찾을 수 없습니다: {file_path}")
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                chunk, cache_key, ready_clip, future = item
+                if cancelled.is_set():
+                    # 아직 시작되지 않은 TTS 요청은 취소하고, 이미 진행 중인 요청의 결과는 버림
+                    complete = False
+                    if future:
+                        self._discard_request(future)
+                    continue
+                try:
+                    streamed = []
+
+                    def play_piece(piece):
+                        streamed.append(piece)
+                        enqueue(piece)
+
+                    clip = ready_clip
+                    if future:
+                        clip = self._finish_synthesis(chunk, emotion, cache_key, future, on_chunk=play_piece)
+                    if not clip:
+                        # 합성 실패 또는 구간 변환 도중 실패로 이 문장의 음성이 (전부) 없음
+                        complete = False
+                    elif not streamed:
+                        enqueue(clip)
+                except Exception as e:
+                    complete = False
+                    print(f"문장 합성 중 오류 발생: {str(e)}")
+        finally:
+            with self._speech_lock:
+                self._active_speeches.discard(cancelled)
+        if source_errors:
+            raise source_errors[0]
+        if wait and not cancelled.is_set():
+            self.player.flush()
+        if not complete or cancelled.is_set():
+            return []
+        return played
+
+    def _discard_request(self, future):
+        """중단으로 버리는 TTS 요청 정리
+
+        버린 요청이 반개방 상태의 시험 요청이었다면 결과를 기록하지 않는 한 차단기가
+        이후 요청을 계속 막으므로, 취소되면 시험 요청을 해제하고 이미 보낸 요청은
+        끝나는 대로 성공/실패를 기록합니다.
+        """
+        def settle(done):
+            if done.cancelled():
+                self.breaker.release_probe()
                 return
-            wf = wave.open(file_path, 'rb')
-            p = pyaudio.PyAudio()
-            stream = p.open(format=p.get_format_from_width(wf.getsampwidth()),
-                          channels=wf.getnchannels(),
-                          rate=wf.getframerate(),
-                          output=True)
-            chunk = 1024
-            data = wf.readframes(chunk)
-            while data:
-                stream.write(data)
-                data = wf.readframes(chunk)
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            try:
+                succeeded = done.result().status_code == 200
+            except Exception:
+                succeeded = False
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+        future.cancel()
+        future.add_done_callback(settle)
+
+    def wait_until_done(self, timeout=None):
+        """재생 큐에 있는 음성이 모두 재생될 때까지 대기"""
+        return self.player.flush(timeout)
+
+    def play_audio(self, audio, wait=True):
+        """오디오 재생
+
+        Args:
+            audio (AudioClip or str): 재생할 오디오 (파일 경로도 허용)
+            wait (bool): 재생이 끝날 때까지 대기할지 여부
+        """
+        try:
+            if isinstance(audio, str):
+                if not os.path.exists(audio):
+                    print(f"파일을 찾을 수 없습니다: {audio}")
+                    return
+                audio = AudioClip.from_file(audio)
+            self.player.play(audio, wait=wait)
         except Exception as e:
-            print(f"오디오 재생 중 오류 발생: {str(e)}")
\ No newline at end of file
+            print(f"오디오 재생 중 오류 발생: {str(e)}")
+
+    def get_metrics(self):
+        """음성 합성 단계별 통계 반환 (실행 중 조회용)
+
+        Returns:
+            dict: 단계별 지연 시간 백분위수/실시간 배율, 카운터, 캐시/브레이커/HTTP 통계
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot["http"] = self.client.stats()
+        snapshot["breaker"] = self.breaker.stats()
+        if self.cache:
+            snapshot["cache"] = self.cache.stats()
+        return snapshot
+
+    def dump_metrics(self, path):
+        """음성 합성 통계를 출력하고 JSON 파일로 저장
+
+        Args:
+            path (str): 저장할 파일 경로
+        """
+        print(self.metrics.format_report())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_metrics(), f, ensure_ascii=False, indent=2)
+
+    def stop_speaking(self):
+        """재생 중인 음성을 즉시 멈추고 대기 중인 음성을 버림
+
+        진행 중인 speak_sentences 호출에도 중단 신호를 보내 남은 문장은 합성/재생하지 않습니다.
+        """
+        with self._speech_lock:
+            for cancelled in self._active_speeches:
+                cancelled.set()
+            self.player.cancel()
+
+    def close(self):
+        """재생 엔진, TTS 클라이언트, 대체 TTS 스레드 종료"""
+        self.player.close()
+        self.client.close()
+        self.fallback.close()
\ No newline at end of file
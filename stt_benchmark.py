@@ -0,0 +1,168 @@
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from audio_sources import WavFileSource
+from latency_metrics import LatencyMetrics
+from model_registry import registry
+from realtime_stt import RealtimeSTT
+
+
+def normalize_text(text):
+    """문장 부호와 대소문자, 공백 차이를 없앤 비교용 텍스트"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def edit_distance(reference, hypothesis):
+    """두 토큰 목록 사이의 편집 거리 (삽입/삭제/치환)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ref_token != hyp_token)))
+        previous = current
+    return previous[-1]
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def load_references(paths):
+    """WAV 파일과 이름이 같은 .txt 파일에서 정답 전사 읽기 (없으면 None)"""
+    references = []
+    for path in paths:
+        transcript = Path(path).with_suffix(".txt")
+        references.append(transcript.read_text(encoding="utf-8").strip() if transcript.exists() else None)
+    return references
+
+
+def run_config(paths, backend, model_size, realtime=True, end_silence=1.0, device=None):
+    """설정 하나로 말뭉치 전체를 음성 인식 경로에 흘려보내고 결과 수집
+
+    Returns:
+        dict: 파일별 결과와 지연 시간/처리량/CPU 통계
+    """
+    files = [{"path": str(path), "texts": [], "speech_end": None, "result_at": None} for path in paths]
+    current = {"index": None}
+
+    def on_file_start(index, path):
+        current["index"] = index
+
+    def on_speech_end(index, timestamp):
+        files[index]["speech_end"] = timestamp
+
+    def on_result(text):
+        entry = files[current["index"]]
+        entry["texts"].append(text)
+        entry["result_at"] = time.perf_counter()
+
+    source = WavFileSource(paths, realtime=realtime, gap_seconds=end_silence + 1.0,
+                           on_file_start=on_file_start, on_speech_end=on_speech_end)
+    stt = RealtimeSTT(model_size=model_size, language="ko", device=device, backend=backend,
+                      end_silence=end_silence, dedupe=False, source=source)
+    # 다음 파일은 이전 파일의 인식이 끝난 뒤에 보내 결과가 섞이지 않도록 함
+    source.wait_idle = stt.wait_idle
+    stt.add_result_callback(on_result)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    stt.start()
+    source.finished.wait()
+    stt.stop()
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+
+    latency = LatencyMetrics()
+    for entry in files:
+        entry["text"] = " ".join(entry.pop("texts"))
+        if entry["result_at"] is not None and entry["speech_end"] is not None:
+            entry["latency"] = entry["result_at"] - entry["speech_end"]
+            latency.record("eos_to_text", entry["latency"])
+        entry.pop("result_at")
+        entry.pop("speech_end")
+
+    stages = stt.metrics.snapshot()["stages"]
+    transcribe = stages.get("stt_transcribe", {})
+    stt_stats = stt.stats()
+    registry.unload_idle(0)
+    return {
+        "backend": backend,
+        "model_size": model_size,
+        "realtime": realtime,
+        "audio_seconds": source.audio_seconds,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "cpu_cores": cpu_seconds / wall_seconds if wall_seconds else 0.0,
+        "throughput_rtf": wall_seconds / source.audio_seconds if source.audio_seconds else None,
+        "decode_rtf_p50": transcribe.get("rtf_p50"),
+        "decode_rtf_p95": transcribe.get("rtf_p95"),
+        "latency": latency.snapshot()["stages"].get("eos_to_text", {}),
+        "vad": stt_stats["vad"],
+        "files": files,
+    }
+
+
+def score(result, references):
+    """말뭉치 전체 WER(단어)과 CER(글자, 공백 제외) 계산"""
+    word_errors = word_total = char_errors = char_total = 0
+    for entry, reference in zip(result["files"], references):
+        if reference is None:
+            continue
+        ref = normalize_text(reference)
+        hyp = normalize_text(entry["text"])
+        word_errors += edit_distance(ref.split(), hyp.split())
+        word_total += len(ref.split())
+        char_errors += edit_distance(list(ref.replace(" ", "")), list(hyp.replace(" ", "")))
+        char_total += len(ref.replace(" ", ""))
+    result["wer"] = word_errors / word_total if word_total else None
+    result["cer"] = char_errors / char_total if char_total else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WAV 말뭉치를 재생해 실시간 음성 인식 성능 측정")
+    parser.add_argument("wav_dir", help="WAV 파일 디렉토리 (같은 이름의 .txt 파일을 정답 전사로 사용)")
+    parser.add_argument("--configs", nargs="+", default=["whisper:base"],
+                        help="측정할 엔진:모델 크기 목록 (예: whisper:medium faster-whisper:medium)")
+    parser.add_argument("--fast", action="store_true", help="실시간 속도 대신 가능한 한 빠르게 재생")
+    parser.add_argument("--end-silence", type=float, default=1.0, help="발화 종료 판단 무음 길이 (초)")
+    parser.add_argument("--device", help="사용할 장치 (기본: 자동 선택)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.wav_dir).glob("*.wav"))
+    if not paths:
+        parser.error("WAV 파일이 없습니다.")
+    references = load_references(paths)
+    print(f"말뭉치: {len(paths)}개 파일, 정답 전사 {sum(r is not None for r in references)}개")
+
+    results = []
+    for config in args.configs:
+        backend, _, model_size = config.partition(":")
+        print(f"\n=== {backend} / {model_size or 'base'} ===")
+        result = run_config(paths, backend, model_size or "base", realtime=not args.fast,
+                            end_silence=args.end_silence, device=args.device)
+        results.append(score(result, references))
+
+    print(f"\n{'설정':<26}{'지연 p50':>9}{'지연 p95':>9}{'RTF':>7}{'CPU 코어':>9}{'WER':>7}{'CER':>7}")
+    for result in results:
+        latency = result["latency"]
+        print(f"{result['backend'] + '/' + result['model_size']:<26}"
+              f"{_fmt(latency.get('p50'), '.2f'):>9}{_fmt(latency.get('p95'), '.2f'):>9}"
+              f"{_fmt(result['decode_rtf_p50'], '.2f'):>7}{result['cpu_cores']:>9.2f}"
+              f"{_fmt(result['wer'], '.3f'):>7}{_fmt(result['cer'], '.3f'):>7}")
+    print("\n지연: 음성 끝 → 텍스트 (초, 발화 종료 판단 무음 포함), RTF: 인식 시간 / 발화 길이 (p50)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+
+
+class STTEngine:
+    """음성 인식 엔진 공통 인터페이스
+
+    모든 엔진은 16kHz float32 모노 배열(또는 오디오 파일 경로)을 받아
+    앞뒤 공백을 제거한 텍스트를 반환합니다.
+    """
+    name = "base"
+
+    def transcribe(self, audio, language="ko", initial_prompt=None, beam_size=1):
+        """오디오를 텍스트로 변환
+
+        Args:
+            audio (np.ndarray or str): 16kHz float32 모노 오디오 또는 파일 경로
+            language (str, optional): 언어 코드 (None이면 자동 감지)
+            initial_prompt (str, optional): 디코딩 앞에 둘 프롬프트
+            beam_size (int): 빔 크기 (1이면 그리디 디코딩)
+
+        Returns:
+            str: 인식된 텍스트
+        """
+        raise NotImplementedError
+
+
+class WhisperEngine(STTEngine):
+    name = "whisper"
+
+    def __init__(self, model_size="base", device=None):
+        """openai-whisper 엔진 (GPU가 있으면 fp16)
+
+        Args:
+            model_size (str): 모델 크기 (tiny, base, small, medium, large)
+            device (str, optional): 사용할 장치 (None이면 자동 선택)
+        """
+        import torch
+        import whisper
+
+        self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
+        self.fp16 = self.device.startswith("cuda")
+        self.model = whisper.load_model(model_size, device=self.device)
+
+    def transcribe(self, audio, language="ko", initial_prompt=None, beam_size=1):
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            fp16=self.fp16,
+            initial_prompt=initial_prompt,
+            beam_size=beam_size,
+            best_of=1,
+        )
+        return result["text"].strip()
+
+
+class FasterWhisperEngine(STTEngine):
+    name = "faster-whisper"
+
+    def __init__(self, model_size="base", device=None, compute_type="int8", cpu_threads=None):
+        """faster-whisper(CTranslate2) 엔진
+
+        같은 Whisper 가중치를 int8로 양자화해 CPU에서 실행하므로, GPU 없이도
+        medium 모델을 실시간에 가까운 속도로 사용할 수 있습니다.
+
+        Args:
+            model_size (str): 모델 크기 (tiny, base, small, medium, large-v3)
+            device (str, optional): "cpu" 또는 "cuda" (None이면 cpu)
+            compute_type (str): 연산 정밀도 ("int8", "int8_float16", "float16", "float32")
+            cpu_threads (int, optional): 사용할 CPU 스레드 수 (None이면 물리 코어 수에 맞춤)
+        """
+        from faster_whisper import WhisperModel
+
+        self.device = "cuda" if device and device.startswith("cuda") else "cpu"
+        self.model = WhisperModel(model_size,
+                                  device=self.device,
+                                  compute_type=compute_type,
+                                  cpu_threads=cpu_threads or max(1, (os.cpu_count() or 2) // 2))
+
+    def transcribe(self, audio, language="ko", initial_prompt=None, beam_size=1):
+        segments, _ = self.model.transcribe(
+            audio,
+            language=language,
+            initial_prompt=initial_prompt,
+            beam_size=beam_size,
+            best_of=1,
+        )
+        # segments는 지연 생성되므로 여기서 끝까지 디코딩됨
+        return "".join(segment.text for segment in segments).strip()
+
+
+STT_BACKENDS = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def create_engine(backend="whisper", model_size="base", device=None, **kwargs):
+    """설정 이름으로 음성 인식 엔진 생성
+
+    Args:
+        backend (str): "whisper" 또는 "faster-whisper"
+        model_size (str): 모델 크기
+        device (str, optional): 사용할 장치
+        **kwargs: 엔진별 추가 설정 (예: compute_type)
+
+    Returns:
+        STTEngine: 생성된 엔진
+    """
+    if backend not in STT_BACKENDS:
+        raise ValueError(f"지원하지 않는 음성 인식 엔진입니다: {backend} (사용 가능: {', '.join(STT_BACKENDS)})")
+    return STT_BACKENDS[backend](model_size=model_size, device=device, **kwargs)
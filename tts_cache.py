@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+import threading
+
+from audio_clip import AudioClip
+
+
+class TTSCache:
+    def __init__(self, cache_dir="tts_cache", max_bytes=200 * 1024 * 1024, max_entries=2000):
+        """합성 음성 디스크 캐시 초기화
+
+        파일 이름은 합성 조건의 해시값(내용 주소)이며, 파일의 수정 시각을
+        마지막 사용 시각으로 사용해 LRU 방식으로 정리합니다.
+
+        Args:
+            cache_dir (str): 캐시 파일을 저장할 디렉토리
+            max_bytes (int): 캐시 전체 최대 용량 (바이트)
+            max_entries (int): 캐시 최대 항목 수
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (크기, 마지막 사용 시각)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_entries()
+
+    def _load_entries(self):
+        """디렉토리를 훑어 기존 캐시 항목 복원"""
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            self._entries[name[:-4]] = (stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def make_key(**params):
+        """합성 조건으로 캐시 키 생성
+
+        Args:
+            **params: 텍스트, 음성, 감정, 속도, RVC 모델, 피치 등 출력에 영향을 주는 값
+
+        Returns:
+            str: SHA-256 캐시 키
+        """
+        raw = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key):
+        """캐시된 음성 조회
+
+        Args:
+            key (str): 캐시 키
+
+        Returns:
+            AudioClip: 캐시된 음성 (없으면 None)
+        """
+        with self._lock:
+            path = self._path(key)
+            if key not in self._entries or not os.path.exists(path):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            try:
+                clip = AudioClip.from_file(path)
+                # 파일 수정 시각을 갱신해 최근 사용으로 표시
+                os.utime(path, None)
+                self._entries[key] = (self._entries[key][0], os.path.getmtime(path))
+            except (OSError, ValueError, EOFError) as e:
+                print(f"음성 캐시 읽기 실패: {e}")
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return clip
+
+    def put(self, key, clip):
+        """음성을 캐시에 저장
+
+        Args:
+            key (str): 캐시 키
+            clip (AudioClip): 저장할 음성
+
+        Returns:
+            str: 캐시 파일 경로 (실패 시 None)
+        """
+        with self._lock:
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(clip.to_wav_bytes())
+                os.replace(temp_path, path)
+                stat = os.stat(path)
+            except OSError as e:
+                print(f"음성 캐시 저장 실패: {e}")
+                return None
+            self._entries[key] = (stat.st_size, stat.st_mtime)
+            self._evict()
+            return path
+
+    def _evict(self):
+        """용량 또는 항목 수 제한을 넘으면 오래된 항목부터 삭제"""
+        total = sum(size for size, _ in self._entries.values())
+        if total <= self.max_bytes and len(self._entries) <= self.max_entries:
+            return
+
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes and len(self._entries) <= self.max_entries:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._entries[key]
+            total -= size
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        """캐시 적중률 (0.0 ~ 1.0)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """캐시 통계 반환
+
+        Returns:
+            dict: 적중/실패/삭제 횟수, 적중률, 항목 수, 전체 용량
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hit_rate,
+                "entries": len(self._entries),
+                "bytes": sum(size for size, _ in self._entries.values()),
+            }
@@ -0,0 +1,162 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class GoogleTTSClient:
+    API_URL = "https://texttospeech.googleapis.com/v1/text:synthesize"
+
+    def __init__(self, api_key, max_workers=4, connect_timeout=3.0, read_timeout=10.0,
+                 hedge_after=None, stats_window=200, metrics=None):
+        """Google Cloud TTS REST 클라이언트 초기화
+
+        keep-alive 연결 풀을 재사용해 매 요청마다 TCP/TLS 연결을 새로 맺지 않고,
+        모든 요청에 제한 시간을 둡니다.
+
+        Args:
+            api_key (str): Google TTS API 키
+            max_workers (int): 동시에 보낼 수 있는 요청 수 (연결 풀 크기)
+            connect_timeout (float): 연결 제한 시간 (초)
+            read_timeout (float): 응답 제한 시간 (초)
+            hedge_after (float or str, optional): 이 시간(초) 안에 응답이 없으면 같은 요청을
+                한 번 더 보내 먼저 온 응답을 사용. "auto"면 최근 p95 지연 시간 사용, None이면 비활성화
+            stats_window (int): 지연 시간 통계에 사용할 최근 요청 수
+            metrics (LatencyMetrics, optional): 요청 지연 시간을 함께 기록할 수집기
+        """
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedge_after = hedge_after
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers * 2, max_retries=0)
+        self.session.mount("https://", adapter)
+
+        # 작업 단위 요청과 헤지용 실제 HTTP 요청을 분리해 서로를 기다리며 멈추지 않도록 함
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-request")
+        self._http_executor = ThreadPoolExecutor(max_workers=max_workers * 2, thread_name_prefix="tts-http")
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=stats_window)
+        self.request_count = 0
+        self.failure_count = 0
+        self.timeout_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
+
+    def _post(self, payload):
+        start_time = time.perf_counter()
+        try:
+            response = self.session.post(self.API_URL, params={"key": self.api_key},
+                                         json=payload, timeout=self.timeout)
+        except requests.Timeout:
+            with self._lock:
+                self.request_count += 1
+                self.timeout_count += 1
+            if self.metrics:
+                self.metrics.increment("tts_timeout")
+            raise
+        except requests.RequestException:
+            with self._lock:
+                self.request_count += 1
+                self.failure_count += 1
+            raise
+
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.request_count += 1
+            self._latencies.append(elapsed)
+            if response.status_code != 200:
+                self.failure_count += 1
+        if self.metrics:
+            self.metrics.record("tts_http", elapsed)
+        return response
+
+    def _hedge_delay(self):
+        if self.hedge_after == "auto":
+            with self._lock:
+                if len(self._latencies) < 20:
+                    return None
+                ordered = sorted(self._latencies)
+            return ordered[int(len(ordered) * 0.95) - 1]
+        return self.hedge_after
+
+    def synthesize(self, payload):
+        """TTS 요청을 보내고 응답을 반환 (필요하면 헤지 요청 포함)
+
+        Args:
+            payload (dict): text:synthesize 요청 본문
+
+        Returns:
+            requests.Response: 응답
+        """
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._post(payload)
+
+        primary = self._http_executor.submit(self._post, payload)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedge_count += 1
+        backup = self._http_executor.submit(self._post, payload)
+
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    error = e
+                    continue
+                if future is backup:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return response
+        raise error
+
+    def submit(self, payload):
+        """TTS 요청을 백그라운드로 보냄
+
+        Args:
+            payload (dict): text:synthesize 요청 본문
+
+        Returns:
+            concurrent.futures.Future: 응답(requests.Response)을 담을 Future
+        """
+        return self._executor.submit(self.synthesize, payload)
+
+    def stats(self):
+        """요청 통계 반환
+
+        Returns:
+            dict: 요청/실패/시간 초과/헤지 횟수와 지연 시간(평균, p50, p95, 초)
+        """
+        with self._lock:
+            ordered = sorted(self._latencies)
+            stats = {
+                "requests": self.request_count,
+                "failures": self.failure_count,
+                "timeouts": self.timeout_count,
+                "hedged": self.hedge_count,
+                "hedge_wins": self.hedge_wins,
+            }
+        if ordered:
+            stats["mean"] = sum(ordered) / len(ordered)
+            stats["p50"] = ordered[len(ordered) // 2]
+            stats["p95"] = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+        return stats
+
+    def close(self):
+        """연결 풀과 작업 스레드 정리"""
+        self._executor.shutdown(wait=False)
+        self._http_executor.shutdown(wait=False)
+        self.session.close()
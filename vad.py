@@ -0,0 +1,151 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    def __init__(self, sample_rate=16000, frame_ms=20, start_margin_db=12.0, stop_margin_db=6.0,
+                 min_speech_db=-50.0, onset_ms=60, end_silence=1.0, min_speech_duration=0.3,
+                 noise_adapt=0.05, max_utterance=30.0):
+        """프레임 단위 음성 구간 검출기 초기화
+
+        블록을 frame_ms 길이의 프레임으로 나눠 에너지(dB)를 한 번에 계산하고,
+        음성이 아닌 구간에서 추적한 잡음 바닥보다 충분히 큰 프레임만 음성으로
+        판단합니다. 시작과 종료 기준을 다르게 두어(히스테리시스) 말끝이나
+        짧은 숨에서 발화가 잘게 끊기지 않습니다.
+
+        Args:
+            sample_rate (int): 입력 샘플레이트
+            frame_ms (int): 프레임 길이 (10~30ms)
+            start_margin_db (float): 발화 시작으로 볼 잡음 바닥 대비 에너지 (dB)
+            stop_margin_db (float): 발화가 이어진다고 볼 잡음 바닥 대비 에너지 (dB)
+            min_speech_db (float): 잡음 바닥과 관계없이 음성으로 볼 최소 에너지 (dBFS)
+            onset_ms (int): 발화 시작으로 판단하기 위해 연속으로 필요한 음성 길이
+            end_silence (float): 발화 종료로 판단할 무음 길이 (초)
+            min_speech_duration (float): 이보다 음성 프레임이 짧은 발화는 오검출로 버림 (초)
+            noise_adapt (float): 잡음 바닥 추적 속도 (0~1)
+            max_utterance (float): 이 길이를 넘는 발화는 강제로 종료 (초)
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.start_margin_db = start_margin_db
+        self.stop_margin_db = stop_margin_db
+        self.min_speech_db = min_speech_db
+        self.onset_frames = max(1, int(onset_ms / frame_ms))
+        self.hangover_frames = max(1, int(end_silence * 1000 / frame_ms))
+        self.min_speech_frames = int(min_speech_duration * 1000 / frame_ms)
+        self.max_utterance_frames = int(max_utterance * 1000 / frame_ms)
+        self.noise_adapt = noise_adapt
+        self.reset()
+
+        self.frame_count = 0
+        self.speech_frame_count = 0
+        self.utterance_count = 0
+        self.false_trigger_count = 0
+        self.rejected_seconds = 0.0
+
+    def reset(self, position=0):
+        """발화 상태와 잡음 바닥 초기화 (통계는 유지)
+
+        Args:
+            position (int): 다음 블록의 절대 샘플 위치
+        """
+        self.noise_floor_db = None
+        self.in_speech = False
+        self.position = position
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._onset_run = 0
+        self._silence_run = 0
+        self._utterance_frames = 0
+        self._utterance_speech_frames = 0
+
+    def _frame_energies(self, block):
+        if len(self._remainder):
+            block = np.concatenate((self._remainder, block))
+        count = len(block) // self.frame_length
+        self._remainder = block[count * self.frame_length:].copy()
+        frames = block[:count * self.frame_length].reshape(count, self.frame_length)
+        power = np.einsum("ij,ij->i", frames, frames) / self.frame_length
+        return 10.0 * np.log10(power + 1e-10)
+
+    def process(self, block):
+        """오디오 블록을 처리하고 발화 경계 이벤트 반환
+
+        Args:
+            block (np.ndarray): float32 모노 오디오
+
+        Returns:
+            list: (이벤트, 절대 샘플 위치) 목록. 이벤트는 발화 시작 "start",
+                발화 종료 "end", 오검출로 버려진 발화 종료 "reject"
+        """
+        events = []
+        # 이전 블록에서 프레임을 채우지 못하고 남은 샘플부터 이번 프레임이 시작됨
+        frame_start = self.position - len(self._remainder)
+        energies = self._frame_energies(np.asarray(block, dtype=np.float32))
+        self.position += len(block)
+        self.frame_count += len(energies)
+
+        if self.noise_floor_db is None and len(energies):
+            self.noise_floor_db = float(energies[0])
+
+        for index, energy in enumerate(energies):
+            frame_end = frame_start + (index + 1) * self.frame_length
+            floor = self.noise_floor_db
+
+            if not self.in_speech:
+                if energy > floor + self.start_margin_db and energy > self.min_speech_db:
+                    self._onset_run += 1
+                    if self._onset_run >= self.onset_frames:
+                        self.in_speech = True
+                        self._silence_run = 0
+                        self._utterance_frames = self._onset_run
+                        self._utterance_speech_frames = self._onset_run
+                        events.append(("start", frame_end - self._onset_run * self.frame_length))
+                    continue
+                self._onset_run = 0
+                # 잡음 바닥은 내려갈 때는 즉시, 올라갈 때는 천천히 따라감
+                if energy < floor:
+                    self.noise_floor_db = float(energy)
+                else:
+                    self.noise_floor_db = float(floor + self.noise_adapt * (energy - floor))
+                continue
+
+            self._utterance_frames += 1
+            if energy > floor + self.stop_margin_db and energy > self.min_speech_db:
+                self._silence_run = 0
+                self._utterance_speech_frames += 1
+            else:
+                self._silence_run += 1
+                # 발화 중에도 아주 천천히 적응해 지속적인 배경음에 갇히지 않도록 함
+                self.noise_floor_db = float(floor + self.noise_adapt * 0.1 * (energy - floor))
+
+            if self._silence_run >= self.hangover_frames or self._utterance_frames >= self.max_utterance_frames:
+                events.append(self._end_utterance(frame_end))
+
+        return events
+
+    def _end_utterance(self, position):
+        self.in_speech = False
+        self._onset_run = 0
+        self._silence_run = 0
+        self.speech_frame_count += self._utterance_speech_frames
+        if self._utterance_speech_frames < self.min_speech_frames:
+            self.false_trigger_count += 1
+            self.rejected_seconds += self._utterance_frames * self.frame_length / self.sample_rate
+            return ("reject", position)
+        self.utterance_count += 1
+        return ("end", position)
+
+    def stats(self):
+        """검출 통계 반환
+
+        Returns:
+            dict: 처리한 프레임 수, 음성 프레임 수, 발화 수, 오검출 수와
+                오검출로 인식을 건너뛴 오디오 길이(초), 현재 잡음 바닥(dBFS)
+        """
+        return {
+            "frames": self.frame_count,
+            "speech_frames": self.speech_frame_count,
+            "utterances": self.utterance_count,
+            "false_triggers": self.false_trigger_count,
+            "rejected_seconds": self.rejected_seconds,
+            "noise_floor_db": self.noise_floor_db,
+        }